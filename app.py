@@ -1,22 +1,54 @@
 import atexit
 import locale
+from collections.abc import Iterator
 from datetime import date
 
-import pandas as pd
 from apscheduler.schedulers.background import BackgroundScheduler
-from flask import Flask, redirect, render_template, url_for
+from flask import (
+    Flask,
+    abort,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    stream_template,
+    url_for,
+)
 from werkzeug import Response
 
 from results_calculator.overall import CATEGORIES
 from results_calculator.race import HDD_MAX_YEAR, ZV_KID_YEAR, ZV_VET_YEAR
+from src.api import ApiCache, build_events_json, build_results_json
+from src.event import build_oris_name_mapping
 from src.event_manager import EventManager
-from src.news import load_news
+from src.news import NewsRepository
+from src.page_cache import PageCache
+from src.results import (
+    ResultsCache,
+    build_datatables_page,
+    query_results_table,
+    results_modified_at,
+    results_signature,
+)
+from src.runners import MAX_SEARCH_RESULTS, RunnerIndex
 
 app = Flask(__name__)
+# Start serving the last known data, fresh data are loaded in the background
 em = EventManager()
-
-# Update the EventManager every 10 mins
+results_cache = ResultsCache()
+news_repository = NewsRepository()
+page_cache = PageCache()
+api_cache = ApiCache()
+runner_index = RunnerIndex()
+
+# Update the EventManager every 10 mins (data are refreshed by a single worker,
+# other workers check every 10 s for data published by it)
 scheduler = BackgroundScheduler()
+scheduler.add_job(
+    func=em.update,
+    id="event_manager_warm_up",
+    name="Load fresh EventManager data after start",
+)
 scheduler.add_job(
     func=em.update,
     trigger="interval",
@@ -24,6 +56,13 @@ scheduler.add_job(
     id="event_manager_update",
     name="Update EventManager data",
 )
+scheduler.add_job(
+    func=em.sync,
+    trigger="interval",
+    seconds=10,
+    id="event_manager_sync",
+    name="Load EventManager data published by another worker",
+)
 # Enable APScheduler logging
 scheduler.print_jobs()
 scheduler.start()
@@ -47,6 +86,25 @@ def home() -> Response:
     return redirect(url_for("news"))
 
 
+# Health check
+@app.route("/health")
+def health() -> Response:
+    """
+    Report status of the loaded data.
+
+    The app serves requests even with stale data (e.g. when ORIS is
+    unreachable), so the status is always '200 OK' and staleness is reported
+    in the body.
+
+    Returns
+    -------
+    JSON with version of the data, times of their last change and refresh and
+    whether they are stale.
+
+    """
+    return jsonify(em.get_status())
+
+
 # Info
 @app.route("/info")
 def info() -> str:
@@ -68,7 +126,7 @@ def info() -> str:
 
 # News
 @app.route("/news")
-def news() -> str:
+def news() -> Response:
     """
     Render the news page.
 
@@ -77,13 +135,18 @@ def news() -> str:
     Rendered HTML template for the news page.
 
     """
-    news_items = load_news()
-    return render_template("news.html", news=news_items)
+    news_items = news_repository.get_items()
+    return page_cache.respond(
+        ("news",),
+        news_repository.version,
+        news_repository.modified_at,
+        lambda: render_template("news.html", news=news_items),
+    )
 
 
 # Calendar
 @app.route("/<string:season>/calendar")
-def calendar(season: str) -> str:
+def calendar(season: str) -> Response:
     """
     Render the calendar page for a specific season.
 
@@ -97,256 +160,148 @@ def calendar(season: str) -> str:
     Rendered HTML template for the calendar page.
 
     """
-    events = em.get_all_events(season, as_dicts=True)
-    return render_template("calendar.html", season=season, events=events)
+    return page_cache.respond(
+        ("calendar", season),
+        em.version,
+        em.updated_at,
+        lambda: render_template(
+            "calendar.html",
+            season=season,
+            events=em.get_all_events(season, as_dicts=True),
+        ),
+    )
 
 
-def _format_results_columns(df: pd.DataFrame) -> pd.DataFrame:
+# Results
+@app.route("/<string:season>/results")
+def results(season: str) -> Response:
     """
-    Format place and points columns in results dataframe.
+    Render the results page for a specific season.
 
     Parameters
     ----------
-    df
-        DataFrame with place and points columns.
+    season
+        Season identifier (e.g., '24-25').
 
     Returns
     -------
-    DataFrame with formatted columns.
+    Rendered HTML template for the results page.
 
     """
-    for place_col in df.filter(regex=r".*-Place"):
-        if df[place_col].dtype == float:
-            df[place_col] = df[place_col].apply(lambda x: f"{x:.0f}.")
-    for points_col in df.filter(regex=r".*-Points"):
-        if df[points_col].dtype == float:
-            df[points_col] = df[points_col].apply(
-                lambda x: f"{x:.0f}"
-            )  # contains nans -> can't be casted to int
-    return df
+    seasons = em.get_all_seasons()
+    signature = results_signature(season)
+    return page_cache.respond(
+        ("results", season),
+        f"{em.version}:{sorted(seasons)}:{signature}",
+        max(em.updated_at, results_modified_at(signature)),
+        lambda: _render_results(season, seasons),
+    )
 
 
-def _build_oris_name_mapping(events: dict) -> dict:
+def _render_results(season: str, seasons: list[str]) -> str:
     """
-    Build mapping from ORIS IDs to event names.
+    Render the results page for a specific season.
+
+    The page contains only the category summary, tables of categories are
+    loaded on demand (see `results_category`).
 
     Parameters
     ----------
-    events
-        Dictionary of event objects.
+    season
+        Season identifier (e.g., '24-25').
+    seasons
+        All available seasons (for the season selector).
 
     Returns
     -------
-    Dictionary mapping ORIS IDs to event names.
+    Rendered HTML template for the results page.
 
     """
-    oris_id_to_name_mapping = {}
-    for ev in events.values():
-        if ev.oris_id and ev.name is not None:
-            if "BZL" in ev.name:
-                name = ev.name.split("BZL: ")[1]
-            else:
-                name = ev.name
-            oris_id_to_name_mapping[ev.oris_id] = name
-    return oris_id_to_name_mapping
+    results = {}
+    try:
+        results = results_cache.get(season, em.get_all_events(season), em.version)
+    finally:
+        return render_template(
+            "results.html",
+            seasons=seasons,
+            season=season,
+            categories=list(results),
+        )
 
 
-def _combine_points_and_places(
-    df: pd.DataFrame, oris_id_to_name_mapping: dict, oris_ids_in_results: set
-) -> tuple[pd.DataFrame, list]:
+@app.route("/<string:season>/results/<string:category>")
+def results_category(season: str, category: str) -> Response:
     """
-    Combine points and places columns into single columns per event.
+    Render the results table of a category (an HTML fragment).
+
+    Query parameters 'start' and 'length' select rows of the table (all rows
+    by default). Requests of DataTables' server-side processing (with the
+    'draw' parameter) are answered with JSON of the requested page of rows,
+    filtered and sorted by the 'search' and 'order' parameters.
 
     Parameters
     ----------
-    df
-        DataFrame with separate points and places columns.
-    oris_id_to_name_mapping
-        Mapping from ORIS IDs to event names.
-    oris_ids_in_results
-        Set of ORIS IDs present in results.
+    season
+        Season identifier (e.g., '24-25').
+    category
+        Category (e.g., 'H').
 
     Returns
     -------
-    Tuple of modified DataFrame and list of columns to drop.
-
-    """
-    cols_to_drop = []
-    for oris_id, name in oris_id_to_name_mapping.items():
-        if oris_id in oris_ids_in_results:
-            df[name] = (
-                df[f"{oris_id}-Points"].astype(str)
-                + " ("
-                + df[f"{oris_id}-Place"].astype(str)
-                + ")"
-            )
-            cols_to_drop.extend([f"{oris_id}-Points", f"{oris_id}-Place"])
-    return df, cols_to_drop
-
+    Rendered HTML fragment with the results table, JSON for DataTables, or
+    404 if the category has no results.
 
-def _is_female(regno: str, name: str) -> bool:
     """
-    Infer female from RegNo (third digit >= 5) or fallback to surname.
-
-    Never raises; invalid RegNo (nereg., wrong format) falls back to
-    surname (-ová, -á). Returns False if undetermined.
-    """
-    try:
-        if regno is None or pd.isna(regno):
-            regno = ""
-        s = str(regno).strip()
-        digits = [c for c in s if c.isdigit()]
-        if len(digits) >= 3:
-            return int(digits[2]) >= 5
-    except (ValueError, IndexError, TypeError):
-        pass
-    try:
-        if name is None or pd.isna(name):
-            return False
-        parts = str(name).strip().split()
-        if not parts:
-            return False
-        surname = parts[0]
-        return surname.endswith(("ová", "á"))
-    except (TypeError, AttributeError):
-        return False
-
-
-def _medal_class_by_category(df: pd.DataFrame) -> dict[str, dict[tuple, str]]:
-    """
-    For categories Z and V, map (place, name) -> medal class for top 3 per gender.
-
-    Keys are (place, name) so tied places get correct medals. Returns
-    dict category -> {(place, name): "medal-gold"|"medal-silver"|"medal-bronze"}.
-    """
-    out: dict[str, dict[tuple, str]] = {}
-    for cat in ["Z", "V"]:
-        if cat not in df["category"].values:
-            out[cat] = {}
-            continue
-        sub = df[df["category"] == cat]
-        if (
-            "RegNo" not in sub.columns
-            or "Jméno" not in sub.columns
-            or "place" not in sub.columns
-        ):
-            out[cat] = {}
-            continue
-        male_rows: list[tuple[int, str]] = []
-        female_rows: list[tuple[int, str]] = []
-        for _, row in sub.iterrows():
-            try:
-                place = row["place"]
-                regno = row["RegNo"]
-                name = row["Jméno"]
-            except (KeyError, TypeError):
-                continue
-            key = (int(place), str(name))
-            if _is_female(regno, name):
-                female_rows.append(key)
-            else:
-                male_rows.append(key)
-        medal_map: dict[tuple, str] = {}
-        for rank, (place, name) in enumerate(
-            sorted(male_rows, key=lambda x: x[0])[:3], start=1
-        ):
-            medal_map[(int(place), str(name))] = [
-                "medal-gold",
-                "medal-silver",
-                "medal-bronze",
-            ][rank - 1]
-        for rank, (place, name) in enumerate(
-            sorted(female_rows, key=lambda x: x[0])[:3], start=1
-        ):
-            medal_map[(int(place), str(name))] = [
-                "medal-gold",
-                "medal-silver",
-                "medal-bronze",
-            ][rank - 1]
-        out[cat] = medal_map
-    return out
+    signature = results_signature(season)
+    if category not in CATEGORIES or None in signature:
+        return Response(status=404)
+    if "draw" in request.args:
+        results = results_cache.get(season, em.get_all_events(season), em.version)
+        return jsonify(build_datatables_page(results[category], request.args))
+
+    start = max(request.args.get("start", 0, type=int), 0)
+    length = request.args.get("length", -1, type=int)
+    return page_cache.respond(
+        ("results", season, category, start, length),
+        f"{em.version}:{signature}",
+        max(em.updated_at, results_modified_at(signature)),
+        lambda: _render_results_category(season, category, start, length),
+    )
 
 
-# Results
-@app.route("/<string:season>/results")
-def results(season: str) -> str:
+def _render_results_category(
+    season: str, category: str, start: int, length: int
+) -> Iterator[str]:
     """
-    Render the results page for a specific season.
+    Render the results table of a category (an HTML fragment).
 
     Parameters
     ----------
     season
         Season identifier (e.g., '24-25').
+    category
+        Category (e.g., 'H').
+    start
+        Index of the first rendered row.
+    length
+        Maximal number of rendered rows (all rows if negative).
 
     Returns
     -------
-    Rendered HTML template for the results page.
+    Stream of parts of the rendered HTML fragment.
 
     """
-    results = {}
-    medal_class_by_category = {}
-    seasons = em.get_all_seasons()
-    try:
-        # Load results per category
-        category_dfs = []
-        for category in CATEGORIES:
-            df = pd.read_csv(
-                f"data/{season}/results/overall_{category}.csv", index_col=0
-            )
-            df["category"] = category
-            df = _format_results_columns(df)
-            category_dfs.append(df)
-        df = pd.concat(category_dfs)
-
-        # Process DataFrame (rename and drop columns etc.)
-        events = em.get_all_events(season)
-        if events is None:
-            return render_template(
-                "results.html",
-                season=season,
-                results={},
-                medal_class_by_category={},
-            )
-
-        oris_id_to_name_mapping = _build_oris_name_mapping(events)
-        oris_ids_in_results = {
-            int(x.split("-")[0]) for x in df.columns if x[0].isdigit()
-        }
-
-        df, cols_to_drop = _combine_points_and_places(
-            df, oris_id_to_name_mapping, oris_ids_in_results
-        )
-
-        best_n_col = str(df.filter(regex=r"Best.*").columns[0])
-        n = best_n_col.split("-", 1)[0][4:]
-        df = (
-            df.rename(
-                columns={
-                    best_n_col: f"Součet ({n} z {len(oris_ids_in_results)})",
-                    "Name": "Jméno",
-                }
-            )
-            .replace(["nan (nan.)", "nan (nan)"], "---")
-            .drop(columns=cols_to_drop)
-        )
-        medal_class_by_category = _medal_class_by_category(df)
-        # Split DataFrame per category
-        for category in CATEGORIES:
-            group_df = df[df["category"] == category].set_index("place", drop=True)
-            results[category] = group_df.drop(columns=["category"])
-    finally:
-        return render_template(
-            "results.html",
-            seasons=seasons,
-            season=season,
-            results=results,
-            medal_class_by_category=medal_class_by_category,
-        )
+    results = results_cache.get(season, em.get_all_events(season), em.version)
+    table = results[category]
+    _, rows = query_results_table(table, start, length)
+    return stream_template(
+        "results_category.html", table=table, rows=rows, total=len(table.rows)
+    )
 
 
 # Event
 @app.route("/<string:season>/event/<string:event_id>/")
-def event(season: str, event_id: str) -> str | Response:
+def event(season: str, event_id: str) -> Response:
     """
     Render the event details page.
 
@@ -364,10 +319,207 @@ def event(season: str, event_id: str) -> str | Response:
     """
     ev = em.get_event(season, event_id)
     if ev:
-        return render_template("event.html", event_data=ev.to_dict())
+        return page_cache.respond(
+            ("event", season, event_id),
+            em.version,
+            em.updated_at,
+            lambda: render_template("event.html", event_data=ev.to_dict()),
+        )
     return redirect(url_for("home"))
 
 
+# API
+@app.route("/api/<string:season>/results")
+@app.route("/api/<string:season>/results/<string:category>")
+def results_api(season: str, category: str | None = None) -> Response:
+    """
+    Get overall results of a season (or of one category) as compact JSON.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g., '24-25').
+    category
+        Category (e.g., 'H'), all categories if not given.
+
+    Returns
+    -------
+    JSON with columns of results of every category, or 404 if the season
+    (or category) has no results.
+
+    """
+    signature = results_signature(season)
+    # The API reads only the overall results (not the display-ready ones)
+    if (category is not None and category not in CATEGORIES) or None in signature[:-1]:
+        return Response(status=404)
+    return api_cache.respond(
+        ("results", season, category),
+        f"{em.version}:{signature}",
+        lambda: build_results_json(season, em.get_all_events(season), category),
+    )
+
+
+@app.route("/api/<string:season>/events")
+def events_api(season: str) -> Response:
+    """
+    Get events of a season as compact JSON.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g., '24-25').
+
+    Returns
+    -------
+    JSON with event ids and columns of event attributes, or 404 if the
+    season has no events.
+
+    """
+    events = em.get_all_events(season)
+    if not events:
+        return Response(status=404)
+    return api_cache.respond(
+        ("events", season),
+        em.version,
+        lambda: build_events_json(season, events),
+    )
+
+
+# Runner
+@app.route("/runner/<string:runner_id>")
+def runner(runner_id: str) -> Response:
+    """
+    Render the page with results of a runner across all seasons.
+
+    Parameters
+    ----------
+    runner_id
+        RegNo of the runner or slug of the name of an unregistered runner.
+
+    Returns
+    -------
+    Rendered HTML template for the runner page, or redirect to home if the
+    runner is not found.
+
+    """
+    if runner_id not in runner_index:
+        return redirect(url_for("home"))
+    return page_cache.respond(
+        ("runner", runner_id),
+        f"{em.version}:{runner_index.signature}",
+        max(em.updated_at, runner_index.modified_at),
+        lambda: _render_runner(runner_id),
+    )
+
+
+def _render_runner(runner_id: str) -> str:
+    """
+    Render the page with results of a runner across all seasons.
+
+    Parameters
+    ----------
+    runner_id
+        RegNo of the runner or slug of the name of an unregistered runner.
+
+    Returns
+    -------
+    Rendered HTML template for the runner page.
+
+    """
+    profile = _runner_profile(runner_id)
+    if profile is None:
+        # The runner disappeared from the index since the check
+        abort(404)
+    return render_template("runner.html", runner=profile)
+
+
+@app.route("/api/runner/<string:runner_id>")
+def runner_api(runner_id: str) -> Response:
+    """
+    Get results of a runner across all seasons as JSON.
+
+    Parameters
+    ----------
+    runner_id
+        RegNo of the runner or slug of the name of an unregistered runner.
+
+    Returns
+    -------
+    JSON with the runner's name, RegNo and results, or 404 if the runner is
+    not found.
+
+    """
+    profile = _runner_profile(runner_id)
+    if profile is None:
+        return Response(status=404)
+    return jsonify(profile)
+
+
+# Search
+@app.route("/search")
+def search() -> str:
+    """
+    Render the page with runners found by name or RegNo.
+
+    Query parameter 'q' is the searched text.
+
+    Returns
+    -------
+    Rendered HTML template for the search page.
+
+    """
+    query = request.args.get("q", "").strip()
+    return render_template(
+        "search.html", query=query, runners=runner_index.search(query)
+    )
+
+
+@app.route("/api/search")
+def search_api() -> Response:
+    """
+    Find runners by name or RegNo (e.g. for typeahead).
+
+    Query parameter 'q' is the searched text, 'limit' is the maximal number
+    of returned runners (10 by default).
+
+    Returns
+    -------
+    JSON list of found runners (id, name, RegNo and seasons).
+
+    """
+    query = request.args.get("q", "")
+    limit = min(request.args.get("limit", 10, type=int), MAX_SEARCH_RESULTS)
+    return jsonify(runner_index.search(query, limit))
+
+
+def _runner_profile(runner_id: str) -> dict | None:
+    """
+    Get a runner from the runner index with names of the races.
+
+    Parameters
+    ----------
+    runner_id
+        RegNo of the runner or slug of the name of an unregistered runner.
+
+    Returns
+    -------
+    Runner's id, name, RegNo and results or None if the runner is not found.
+
+    """
+    profile = runner_index.get(runner_id)
+    if profile is None:
+        return None
+    race_names: dict[str, dict[int, str]] = {}
+    for record in profile["records"]:
+        season = record["season"]
+        if season not in race_names:
+            race_names[season] = build_oris_name_mapping(
+                em.get_all_events(season) or {}
+            )
+        record["race_name"] = race_names[season].get(record["race"], record["race"])
+    return profile
+
+
 # jinja filters
 @app.template_filter("day_from_date")
 def _filter_day(input_date: date) -> str:
@@ -0,0 +1,92 @@
+"""
+Benchmark of scoring overall results on a synthetic season.
+
+Run it from the repository root:
+
+    python -m benchmarks.overall_scoring
+
+Every category of the synthetic season has the given number of runners, each
+of them ran about half of the races. Time per runner should stay (roughly)
+constant as the number of runners grows, i.e. scoring scales linearly.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import typer
+
+from results_calculator.overall import (
+    CATEGORIES,
+    _assign_medals,
+    _assign_overall_place,
+    _best_n_races,
+)
+
+
+def main(
+    races: int = typer.Option(12, help="Number of races of the season."),
+    repeat: int = typer.Option(3, help="Number of runs (the fastest one counts)."),
+    seed: int = typer.Option(0, help="Seed of the random generator."),
+) -> None:
+    """
+    Time best-N sums, overall places and medals for growing categories.
+
+    Parameters
+    ----------
+    races
+        Number of races of the season.
+    repeat
+        Number of runs of every size (the fastest one is reported).
+    seed
+        Seed of the random generator of the synthetic season.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for runners in [1_250, 2_500, 5_000, 10_000, 20_000, 40_000]:
+        season = {
+            category: _synthetic_category(rng, runners, races)
+            for category in CATEGORIES
+        }
+        timings = []
+        for _ in range(repeat):
+            results = {category: df.copy() for category, df in season.items()}
+            start = time.perf_counter()
+            results = _assign_medals(_assign_overall_place(_best_n_races(results)))
+            timings.append(time.perf_counter() - start)
+        elapsed = min(timings) / len(CATEGORIES)
+        rows.append(
+            {
+                "Runners per category": runners,
+                "Time per category (ms)": elapsed * 1e3,
+                "Time per 1000 runners (ms)": elapsed * 1e6 / runners,
+            }
+        )
+    typer.echo(
+        pd.DataFrame(rows).to_markdown(index=False, floatfmt=("g", ".1f", ".1f"))
+    )
+
+
+def _synthetic_category(
+    rng: np.random.Generator, runners: int, races: int
+) -> pd.DataFrame:
+    """
+    Generate overall results of a category before scoring.
+
+    Columns are the same as in the output of `_build_results_matrix` (Name,
+    RegNo and place and points of every race, missing results are empty).
+    """
+    data: dict[str, object] = {
+        "Name": [f"Runner{i:06d} Test" for i in range(runners)],
+        "RegNo": [f"ZBM{i % 10_000:04d}" for i in range(runners)],
+    }
+    for oris_id in range(1, races + 1):
+        ran = rng.random(runners) < 0.5
+        points = rng.integers(0, 201, size=runners).astype(float)
+        data[f"{oris_id}-Place"] = pd.Series("1.", index=range(runners)).where(ran)
+        data[f"{oris_id}-Points"] = np.where(ran, points, np.nan)
+    return pd.DataFrame(data)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,6 +1,10 @@
 from results_calculator.cli import app
+from results_calculator.display import display_results  # noqa: F401
+from results_calculator.duplicates import duplicates  # noqa: F401
 from results_calculator.overall import overall  # noqa: F401
 from results_calculator.race import race  # noqa: F401
+from results_calculator.runner_index import runner_index  # noqa: F401
+from results_calculator.season_build import season_build  # noqa: F401
 
 if __name__ == "__main__":
     app()
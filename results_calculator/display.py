@@ -0,0 +1,124 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import typer
+
+from results_calculator.cli import app
+from results_calculator.files import write_if_changed
+from results_calculator.overall import CATEGORIES, _assign_medals
+
+# Display-ready overall results of a season (read by the web)
+DISPLAY_RESULTS_FILE = "results_display.json"
+
+# Cell of a race the runner didn't run
+MISSING_CELL = "---"
+
+
+@app.command("display-results")
+def display_results(season: str) -> None:
+    """
+    Export display-ready overall results of a season.
+
+    Cells are formatted as they are shown on the web (e.g. '182 (3.)'), races
+    are identified by their ORIS IDs (the web names and orders them by its
+    events). Run it after 'overall'.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g. '24-25').
+    """
+    try:
+        results = load_overall_results(season)
+    except FileNotFoundError as e:
+        logging.error("Overall results of season '%s' are missing!\n%s", season, e)
+        raise typer.Exit(code=1)
+    display = build_display_results(season, results)
+    output_file = Path(f"data/{season}/results/{DISPLAY_RESULTS_FILE}")
+    content = json.dumps(display, ensure_ascii=False, separators=(",", ":"))
+    if write_if_changed(output_file, content + "\n"):
+        logging.info("Display-ready results exported to '%s'", output_file)
+    else:
+        logging.info("Display-ready results in '%s' are unchanged", output_file)
+
+
+def load_overall_results(season: str) -> dict[str, pd.DataFrame]:
+    """
+    Load overall results of all categories (all values as strings).
+
+    Results calculated before medals were stored in them get medals assigned
+    here (see `_assign_medals`).
+    """
+    results = {
+        category: pd.read_csv(
+            f"data/{season}/results/overall_{category}.csv",
+            index_col=0,
+            dtype=str,
+            keep_default_na=False,
+        )
+        for category in CATEGORIES
+    }
+    if any("medal" not in df.columns for df in results.values()):
+        ranked = {
+            category: df.assign(place=pd.to_numeric(df["place"]))
+            for category, df in results.items()
+        }
+        for category, df in _assign_medals(ranked).items():
+            results[category]["medal"] = df["medal"]
+    return results
+
+
+def build_display_results(
+    season: str, results: dict[str, pd.DataFrame]
+) -> dict[str, Any]:
+    """
+    Build display-ready overall results of a season.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g. '24-25').
+    results
+        Overall results of every category (see `load_overall_results`).
+
+    Returns
+    -------
+    Season, ORIS IDs of all races of the season and, for every category,
+    column headers and rows. A row consists of place, medal ('gold', 'silver',
+    'bronze' or empty) and formatted cells (name, RegNo, total of the best N
+    races and points and place of every race of the season). Headers of race
+    columns are left to the web.
+    """
+    races: list[int] = []
+    for df in results.values():
+        for col in df.columns:
+            if col.endswith("-Place") and int(col.split("-")[0]) not in races:
+                races.append(int(col.split("-")[0]))
+
+    categories = {}
+    for category, df in results.items():
+        best_n_col = str(df.filter(regex=r"Best.*").columns[0])
+        n = best_n_col.split("-", 1)[0][4:]
+        cells = pd.DataFrame(
+            {
+                "place": df["place"],
+                "medal": df["medal"],
+                "name": df["Name"],
+                "reg_no": df["RegNo"],
+                "total": df[best_n_col],
+            }
+        )
+        for oris_id in races:
+            points = df.get(f"{oris_id}-Points", pd.Series("", index=df.index))
+            places = df.get(f"{oris_id}-Place", pd.Series("", index=df.index))
+            cells[oris_id] = (points + " (" + places + ")").where(
+                points != "", MISSING_CELL
+            )
+        categories[category] = {
+            "columns": ["Jméno", "RegNo", f"Součet ({n} z {len(races)})"],
+            "rows": cells.to_numpy().tolist(),
+        }
+    return {"season": season, "races": races, "categories": categories}
@@ -0,0 +1,259 @@
+import difflib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import typer
+
+from results_calculator.cli import app
+from results_calculator.files import write_if_changed
+from results_calculator.race import get_yob, normalize_name
+
+# Directory for persistent caches (can be changed by BZL_CACHE_DIR env. variable)
+CACHE_DIR = Path(os.environ.get("BZL_CACHE_DIR", "data/cache"))
+
+# Length of name token prefixes used as blocking keys
+BLOCK_PREFIX_LENGTH = 4
+
+# Blocks with more runners are skipped (too common prefix, e.g. 'nova'), so the
+# number of compared pairs stays linear in the number of runners (runners with
+# equal names are compared anyway, skipped blocks are logged)
+MAX_BLOCK_SIZE = 50
+
+# Minimum similarity of (token sorted) normalized names of duplicate candidates
+SIMILARITY_THRESHOLD = 0.85
+
+# Persistent cache of normalized names (shared by all runs)
+NAME_KEYS_FILE = CACHE_DIR / "name_keys.json"
+
+_name_keys: dict[str, str] | None = None
+
+
+def get_name_keys(names: pd.Series) -> pd.Series:
+    """
+    Get normalized names (see `normalize_name`) of runners.
+
+    Normalized names are cached in memory and in `NAME_KEYS_FILE` (saved by
+    `save_name_keys`), so every distinct name is normalized only once.
+    """
+    global _name_keys
+    if _name_keys is None:
+        try:
+            with NAME_KEYS_FILE.open(encoding="utf-8") as f:
+                _name_keys = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _name_keys = {}
+    for name in names.unique():
+        if name not in _name_keys:
+            _name_keys[name] = normalize_name(name)
+    return names.map(_name_keys)
+
+
+def save_name_keys() -> None:
+    """Store the cache of normalized names (unchanged cache isn't rewritten)."""
+    if _name_keys is None:
+        return
+    NAME_KEYS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(
+        NAME_KEYS_FILE, json.dumps(_name_keys, ensure_ascii=False, sort_keys=True)
+    )
+
+
+def find_candidate_pairs(runners: pd.DataFrame) -> pd.DataFrame:
+    """
+    Find pairs of probable duplicate runners.
+
+    Runners are grouped to blocks by prefixes of tokens of their normalized
+    name (and by the whole name), only runners in the same block are compared.
+    Names are compared with sorted tokens, so swapped first name and surname
+    match. Runners with different (known) years of birth are never candidates.
+    Runners with different names are candidates only if the surname (the
+    first token) of one of them is in the name of the other one, so similar
+    surnames (e.g. 'Dvořák Petr' and 'Dvořáček Petr') don't match, and if they
+    don't have different valid RegNos.
+
+    Parameters
+    ----------
+    runners
+        Runners with Name and RegNo columns (and unique index).
+
+    Returns
+    -------
+    Index labels of both runners ('left', 'right') and similarity of their
+    names, sorted by 'left' and 'right'.
+    """
+    name_keys = get_name_keys(runners["Name"])
+    sorted_keys = name_keys.str.split().map(lambda tokens: " ".join(sorted(tokens)))
+    pos = pd.Series(np.arange(len(runners)), index=runners.index)
+
+    # Blocks: (prefix of a name token) -> positions of runners
+    blocks = (
+        pd.DataFrame({"pos": pos.to_numpy(), "token": name_keys.str.split().to_numpy()})
+        .explode("token")
+        .dropna()
+    )
+    blocks["block"] = blocks["token"].str[:BLOCK_PREFIX_LENGTH]
+    blocks = blocks.drop_duplicates(["block", "pos"])
+    block_counts = blocks["block"].value_counts()
+    skipped = block_counts[block_counts > MAX_BLOCK_SIZE]
+    if not skipped.empty:
+        logging.warning(
+            "%d blocks with more than %d runners are skipped (only runners with "
+            "equal names are compared in them): %s",
+            len(skipped),
+            MAX_BLOCK_SIZE,
+            ", ".join(f"'{block}' ({size})" for block, size in skipped.items()),
+        )
+    block_sizes = blocks["block"].map(block_counts)
+    blocks = blocks.loc[block_sizes.between(2, MAX_BLOCK_SIZE), ["block", "pos"]]
+    # Runners with equal names are always compared (regardless of block size)
+    name_blocks = pd.DataFrame(
+        {"block": "=" + sorted_keys.to_numpy(dtype=object), "pos": pos.to_numpy()}
+    )
+    blocks = pd.concat(
+        [blocks, name_blocks[name_blocks["block"].duplicated(keep=False)]]
+    )
+
+    pairs = blocks.merge(blocks, on="block", suffixes=("_left", "_right"))
+    pairs = pairs.loc[
+        pairs["pos_left"] < pairs["pos_right"], ["pos_left", "pos_right"]
+    ].drop_duplicates()
+
+    left = pairs["pos_left"].to_numpy(dtype=int)
+    right = pairs["pos_right"].to_numpy(dtype=int)
+    keys = sorted_keys.to_numpy(dtype=object)
+    tokens = name_keys.str.split().to_numpy(dtype=object)
+    same_surname = np.array(
+        [
+            bool(tokens[i])
+            and bool(tokens[j])
+            and (tokens[i][0] in tokens[j] or tokens[j][0] in tokens[i])
+            for i, j in zip(left, right)
+        ],
+        dtype=bool,
+    )
+    names = name_keys.to_numpy(dtype=object)
+    same_name = names[left] == names[right]
+    similarity = np.array(
+        [
+            difflib.SequenceMatcher(None, keys[i], keys[j]).ratio()
+            for i, j in zip(left, right)
+        ],
+        dtype=float,
+    )
+    yob = get_yob(runners["RegNo"], log_errors=False).to_numpy(
+        dtype=float, na_value=np.nan
+    )
+    different_yob = (yob[left] != yob[right]) & ~np.isnan(yob[left] + yob[right])
+    reg_nos = runners["RegNo"].fillna("nereg.").astype(str)
+    is_valid = (~reg_nos.str.isdigit() & ~reg_nos.str.contains("nereg")).to_numpy()
+    reg_nos = reg_nos.to_numpy(dtype=object)
+    different_reg_no = (
+        is_valid[left] & is_valid[right] & (reg_nos[left] != reg_nos[right])
+    )
+    is_candidate = ~different_yob & (
+        same_name
+        | ((similarity >= SIMILARITY_THRESHOLD) & same_surname & ~different_reg_no)
+    )
+
+    return (
+        pd.DataFrame(
+            {
+                "left": runners.index[left[is_candidate]],
+                "right": runners.index[right[is_candidate]],
+                "similarity": similarity[is_candidate],
+            }
+        )
+        .sort_values(["left", "right"])
+        .reset_index(drop=True)
+    )
+
+
+def group_candidates(index: pd.Index, pairs: pd.DataFrame) -> pd.Series:
+    """
+    Group runners connected by candidate pairs.
+
+    Parameters
+    ----------
+    index
+        Index labels of all runners.
+    pairs
+        Candidate pairs (see `find_candidate_pairs`).
+
+    Returns
+    -------
+    Group number of every runner (runners without candidates get own group).
+    """
+    parent = {label: label for label in index}
+
+    def find(label: Any) -> Any:
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    for left, right in pairs[["left", "right"]].itertuples(index=False):
+        root_left, root_right = find(left), find(right)
+        if root_left != root_right:
+            parent[max(root_left, root_right)] = min(root_left, root_right)
+    roots = pd.Series([find(label) for label in index], index=index)
+    return pd.Series(pd.factorize(roots)[0], index=index)
+
+
+@app.command()
+def duplicates(
+    output_file: Path | None = typer.Option(
+        None, "--output", "-o", help="Save candidate pairs to a CSV file."
+    ),
+) -> None:
+    """
+    List probable duplicate runners across all categories and seasons.
+
+    All runners (distinct Name and RegNo) from points files of all seasons in
+    'data/' are compared (see `find_candidate_pairs`), so typos, swapped names
+    or a missing RegNo are found. Candidate pairs are listed with seasons and
+    categories in which the runners ran.
+
+    The report is only informative: 'overall' resolves duplicates within
+    a category of a season, so candidates from different categories or
+    seasons are never merged. Fix them in the points files (or in
+    'known_unregs.json') if they are the same runner.
+
+    Parameters
+    ----------
+    output_file, optional
+        CSV file to save the candidate pairs to.
+    """
+    points = []
+    for points_file in sorted(Path("data").glob("*-*/results/points_*.csv")):
+        df = pd.read_csv(points_file, usecols=["ClassDesc", "Name", "RegNo"])
+        points.append(df.assign(Season=points_file.parents[1].name))
+    if not points:
+        logging.warning("No points files found!")
+        return
+
+    df_points = pd.concat(points, ignore_index=True)
+    df_points["Name"] = df_points["Name"].str.strip()
+    df_points["RegNo"] = df_points["RegNo"].fillna("nereg.")
+    runners = df_points.groupby(["Name", "RegNo"], as_index=False).agg(
+        Seasons=("Season", lambda s: ", ".join(sorted(s.unique()))),
+        Categories=("ClassDesc", lambda s: ", ".join(sorted(s.unique()))),
+    )
+    pairs = find_candidate_pairs(runners)
+    save_name_keys()
+
+    left = runners.loc[pairs["left"]].reset_index(drop=True)
+    right = runners.loc[pairs["right"]].reset_index(drop=True)
+    report = pd.concat(
+        [left.add_suffix(" 1"), right.add_suffix(" 2"), pairs["similarity"]], axis=1
+    ).sort_values("similarity", ascending=False)
+    logging.info(
+        "Found %d candidate pairs among %d runners.", len(report), len(runners)
+    )
+    typer.echo(report.to_markdown(index=False, floatfmt=".2f"))
+    if output_file is not None:
+        report.to_csv(output_file, index=False)
@@ -0,0 +1,34 @@
+import hashlib
+from pathlib import Path
+
+
+def file_hash(path: Path) -> str:
+    """Get hash of a file's content."""
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def write_if_changed(path: Path, content: str | bytes) -> bool:
+    """
+    Write content to a file only if it differs from the current content.
+
+    Unchanged files keep their modification time, so caches keyed on it (e.g.
+    in the web app) are not invalidated.
+
+    Returns
+    -------
+    True if the file was written.
+    """
+    try:
+        if isinstance(content, bytes):
+            if path.read_bytes() == content:
+                return False
+        elif path.read_text(encoding="utf-8") == content:
+            return False
+    except FileNotFoundError:
+        pass
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+        return True
+    with path.open("w", encoding="utf-8", newline="") as f:
+        f.write(content)
+    return True
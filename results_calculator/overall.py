@@ -1,243 +1,404 @@
+import hashlib
+import json
 import logging
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import typer
-import unidecode as udc
 
 from results_calculator.cli import app
+from results_calculator.duplicates import (
+    find_candidate_pairs,
+    get_name_keys,
+    group_candidates,
+    save_name_keys,
+)
+from results_calculator.files import file_hash, write_if_changed
+from results_calculator.overall_state import (
+    OverallState,
+    load_decisions,
+    load_state,
+    save_decisions,
+    save_state,
+)
 from results_calculator.race import get_yob
 
 CATEGORIES = ["H", "D", "Z", "V", "HDD"]
 
+# Categories with medals for the top 3 men and the top 3 women (other
+# categories have medals for places 1-3)
+MEDALS_BY_GENDER_CATEGORIES = ["Z", "V"]
+MEDALS = ["gold", "silver", "bronze"]
+
 
 @app.command()
-def overall(season: str) -> None:
-    """Calculate overall results for a given season."""
+def overall(
+    season: str,
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        "-i",
+        help="Reuse state of the previous run and process only new or changed "
+        "race results.",
+    ),
+    interactive: bool = typer.Option(
+        True,
+        "--interactive/--non-interactive",
+        help="Ask about duplicate runners that can't be resolved automatically "
+        "(or fail and list them).",
+    ),
+) -> None:
+    """
+    Calculate overall results for a given season.
+
+    Manual decisions about duplicate runners are recorded in a journal
+    ('data/<season>/results/decisions.json') and replayed in following runs.
+    In non-interactive mode, the command fails without exporting anything if
+    there are duplicates with no recorded decision and lists them.
+    """
+    previous_state = load_state(season) if incremental else None
+    try:
+        decisions = load_decisions(season)
+    except json.JSONDecodeError:
+        raise typer.Exit(code=1)
+
     # Get overall results
-    ovr_results = _get_overall_results(season)
-    if ovr_results is None:
+    ovr_results, state = _get_overall_results(season, previous_state)
+    if ovr_results is None or state is None:
         return
 
     # Solve duplicities
-    ovr_res_wout_dupl = _solve_duplicates(ovr_results)
+    undecided: list[pd.DataFrame] | None = None if interactive else []
+    ovr_res_wout_dupl = _solve_duplicates(ovr_results, decisions, undecided)
+    save_decisions(season, decisions)
+    save_name_keys()
+    if undecided:
+        for group in undecided:
+            logging.error(
+                "No decision about these possible duplicate runners (%s):\n%s",
+                _group_fingerprint(group),
+                group.T.to_markdown(),
+            )
+        logging.error(
+            "%d group(s) of duplicate runners need a manual decision, run "
+            "'overall %s' interactively.",
+            len(undecided),
+            season,
+        )
+        raise typer.Exit(code=1)
 
     # Get best N races
     final_results = _best_n_races(ovr_res_wout_dupl)
 
-    # Assign overall place
+    # Assign overall place and medals
     final_results = _assign_overall_place(final_results)
+    final_results = _assign_medals(final_results)
 
-    # Export results
+    # Export results (unchanged files are not rewritten)
     for class_desc in CATEGORIES:
-        final_results[class_desc].to_csv(
-            f"data/{season}/results/overall_{class_desc}.csv"
-        )
+        output_file = Path(f"data/{season}/results/overall_{class_desc}.csv")
+        if write_if_changed(output_file, final_results[class_desc].to_csv()):
+            logging.info("Overall results exported to '%s'", output_file)
+        else:
+            logging.info("Overall results in '%s' are unchanged", output_file)
 
+    save_state(season, state)
 
-def _get_overall_results(season: str) -> dict[str, pd.DataFrame] | None:
+
+def _get_overall_results(
+    season: str, previous_state: OverallState | None = None
+) -> tuple[dict[str, pd.DataFrame] | None, OverallState | None]:
     """
     Go through all 'points_<id>.csv' files and create overall results.
 
     Processes all race results in a season's directory and creates overall
-    results from points for each category.
+    results from points for each category. If a previous state is given, only
+    races that changed since then (and all races after them) are processed.
     """
     # Get filenames and ids of races with assigned points
     filenames, race_ids = _get_filenames_and_ids(season)
 
     if len(filenames) == 0:
         logging.warning("No event results found for season '%s'!", season)
-        return None
+        return None, None
 
-    races = {}
-    columns_list = ["Name", "RegNo"]
+    file_hashes = {r_id: file_hash(f) for r_id, f in zip(race_ids, filenames)}
+    filename_by_id = dict(zip(race_ids, filenames))
 
-    # For each race add <id>-Place and <id>-Points column
-    for r_id, r_filename in zip(race_ids, filenames):
-        races[r_id] = pd.read_csv(r_filename, index_col=False)
-        columns_list.extend([f"{r_id}-Place", f"{r_id}-Points"])
+    runners, entries = None, None
+    unchanged: list[int] = []
+    if previous_state is not None:
+        unchanged = previous_state.unchanged_races(race_ids, file_hashes)
+        runners = previous_state.runners[previous_state.runners["race"].isin(unchanged)]
+        entries = previous_state.entries[previous_state.entries["race"].isin(unchanged)]
+        logging.info(
+            "Reusing %d unchanged race(s), processing %d race(s).",
+            len(unchanged),
+            len(race_ids) - len(unchanged),
+        )
 
-    # Create overall results - dataframe for every category
-    ovr_results = {cat: pd.DataFrame(columns=columns_list) for cat in CATEGORIES}
+    races_to_process = race_ids[len(unchanged) :]
+    races = {
+        r_id: pd.read_csv(filename_by_id[r_id], index_col=False)
+        for r_id in races_to_process
+    }
 
-    # Iterate through races and runners and add them to overall results
-    for r_id in race_ids:
-        race: pd.DataFrame = races[r_id]
-        new_runners = _initialize_new_runners(r_id)
+    # Assign race results to runners and create overall results from them
+    runners, entries = _resolve_runners(races, races_to_process, runners, entries)
+    state = OverallState(race_ids, file_hashes, runners, entries)
+    return _build_results_matrix(runners, entries, race_ids), state
 
-        # Iterate through runners
-        for _, race_result in race.iterrows():
-            _process_runner(race_result, r_id, ovr_results, new_runners)
 
-        # Add all new runners to overall results of particular category
-        ovr_results = _merge_new_runners(ovr_results, new_runners)
-    return ovr_results
+def _resolve_runners(
+    races: dict[int, pd.DataFrame],
+    race_ids: list[int],
+    runners: pd.DataFrame | None = None,
+    entries: pd.DataFrame | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Assign every race result to a runner of the overall results.
 
+    Races are processed in the given order, runners who haven't appeared in
+    previous races are added as new ones (in order of their first appearance).
+    Already known runners and their results can be passed to continue with
+    processing of further races.
 
-def _initialize_new_runners(r_id: int) -> dict[str, dict[str, list[Any]]]:
-    """Initialize data structure for new runners in a race."""
-    new_runners: dict[str, dict[str, list[Any]]] = {}
-    for class_desc in CATEGORIES:
-        new_runners[class_desc] = {
-            "Name": [],
-            "RegNo": [],
-            f"{r_id}-Place": [],
-            f"{r_id}-Points": [],
-        }
-    return new_runners
+    Returns
+    -------
+    Runners ('runner' id, ClassDesc, Name, RegNo, 'race' of first appearance)
+    and their race results ('runner' id, ClassDesc, race, Place, Points).
+    """
+    if runners is None:
+        runners = pd.DataFrame(
+            {
+                "runner": pd.Series(dtype=int),
+                "ClassDesc": pd.Series(dtype=object),
+                "Name": pd.Series(dtype=object),
+                "RegNo": pd.Series(dtype=object),
+                "race": pd.Series(dtype=int),
+            }
+        )
+    all_entries = [] if entries is None else [entries]
+    for r_id in race_ids:
+        new_runners, race_entries = _resolve_race_runners(races[r_id], r_id, runners)
+        runners = pd.concat([runners, new_runners.assign(race=r_id)], ignore_index=True)
+        all_entries.append(race_entries)
+    return runners, pd.concat(all_entries, ignore_index=True)
 
 
-def _process_runner(
-    race_result: pd.Series,
-    r_id: int,
-    ovr_results: dict[str, pd.DataFrame],
-    new_runners: dict[str, dict[str, list[Any]]],
-) -> None:
-    """Process a single runner's race result."""
-    reg_no = race_result["RegNo"]
-    class_desc = race_result["ClassDesc"]
+def _resolve_race_runners(
+    race: pd.DataFrame, r_id: int, runners: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Match results of a single race to runners from previous races.
 
-    if class_desc not in ovr_results:
-        logging.warning("Category '%s' not found in overall results.", class_desc)
-        return
+    Registered runners are identified by category and RegNo. Runners without
+    a registration number ('nereg.') are identified by category and name (they
+    also match registered runners with the same name from previous races). If
+    such a runner's name is already taken by a runner new in this race, the
+    result is skipped with a warning.
 
-    # Registered runners
-    if len(reg_no) == 7 and 64 < ord(reg_no[0]) < 91:
-        _process_registered_runner(
-            race_result, r_id, reg_no, class_desc, ovr_results, new_runners
-        )
-    # Not registered runners ('nereg.')
-    else:
-        _process_unregistered_runner(
-            race_result, r_id, class_desc, ovr_results, new_runners
-        )
+    Returns
+    -------
+    New runners and race results of all (new and existing) runners.
+    """
+    race = race.reset_index(drop=True).rename_axis("pos").reset_index()
+    warnings: list[tuple[int, str, tuple[Any, ...]]] = []
 
+    known_category = race["ClassDesc"].isin(CATEGORIES)
+    warnings.extend(
+        (pos, "Category '%s' not found in overall results.", (class_desc,))
+        for pos, class_desc in race.loc[~known_category, "ClassDesc"].items()
+    )
+    race = race[known_category]
+    registered = race["RegNo"].str.len().eq(7) & race["RegNo"].str[0].between("A", "Z")
 
-def _process_registered_runner(
-    race_result: pd.Series,
-    r_id: int,
-    reg_no: str,
-    class_desc: str,
-    ovr_results: dict[str, pd.DataFrame],
-    new_runners: dict[str, dict[str, list[Any]]],
-) -> None:
-    """Process a registered runner's result."""
-    if reg_no in ovr_results[class_desc]["RegNo"].values:
-        reg_no_mask = ovr_results[class_desc]["RegNo"] == reg_no
-        ovr_results[class_desc].loc[reg_no_mask, f"{r_id}-Place"] = race_result["Place"]
-        ovr_results[class_desc].loc[reg_no_mask, f"{r_id}-Points"] = race_result[
-            "Points"
-        ]
-    else:
-        new_runners[class_desc]["Name"].append(race_result["Name"])
-        new_runners[class_desc]["RegNo"].append(reg_no)
-        new_runners[class_desc][f"{r_id}-Place"].append(race_result["Place"])
-        new_runners[class_desc][f"{r_id}-Points"].append(race_result["Points"])
-
-
-def _process_unregistered_runner(
-    race_result: pd.Series,
-    r_id: int,
-    class_desc: str,
-    ovr_results: dict[str, pd.DataFrame],
-    new_runners: dict[str, dict[str, list[Any]]],
-) -> None:
-    """Process an unregistered runner's result."""
-    name = race_result["Name"]
-
-    if name in ovr_results[class_desc]["Name"].values:
-        if name in new_runners[class_desc]["Name"]:
-            logging.warning(
-                "WARNING: Runner without a registration number named "
-                "'%s' is already listed in race '%s' in category '%s'.",
-                race_result["Name"],
-                r_id,
-                class_desc,
-            )
-        else:
-            name_mask = ovr_results[class_desc]["Name"] == name
-            ovr_results[class_desc].loc[name_mask, f"{r_id}-Place"] = race_result[
-                "Place"
-            ]
-            ovr_results[class_desc].loc[name_mask, f"{r_id}-Points"] = race_result[
-                "Points"
-            ]
-    elif name in new_runners[class_desc]["Name"]:
-        logging.warning(
+    # Registered runners
+    reg_matches = race[registered].merge(
+        runners[["runner", "ClassDesc", "RegNo"]],
+        on=["ClassDesc", "RegNo"],
+        how="left",
+    )
+    reg_assigned = reg_matches[reg_matches["runner"].notna()]
+    reg_new = reg_matches[reg_matches["runner"].isna()]
+
+    # Not registered runners ('nereg.')
+    unreg = race[~registered]
+    name_exists = pd.MultiIndex.from_frame(unreg[["ClassDesc", "Name"]]).isin(
+        pd.MultiIndex.from_frame(runners[["ClassDesc", "Name"]])
+    )
+    # Position of the first new registered runner with the same name
+    first_reg_new_pos = (
+        reg_new.groupby(["ClassDesc", "Name"])["pos"].min().rename("reg_new_pos")
+    )
+    reg_new_before = (
+        unreg.join(first_reg_new_pos, on=["ClassDesc", "Name"])["reg_new_pos"]
+        < unreg["pos"]
+    ).to_numpy()
+    first_occurrence = ~unreg.duplicated(["ClassDesc", "Name"]).to_numpy()
+    unreg_new_mask = ~name_exists & first_occurrence & ~reg_new_before
+    unreg_existing_mask = name_exists & ~reg_new_before
+
+    unreg_new = unreg[unreg_new_mask]
+    unreg_assigned = unreg[unreg_existing_mask].merge(
+        runners[["runner", "ClassDesc", "Name"]], on=["ClassDesc", "Name"]
+    )
+    warnings.extend(
+        (
+            pos,
             "WARNING: Runner without a registration number named "
             "'%s' is already listed in race '%s' in category '%s'.",
-            race_result["Name"],
-            r_id,
-            class_desc,
+            (name, r_id, class_desc),
         )
-    else:
-        new_runners[class_desc]["Name"].append(name)
-        new_runners[class_desc]["RegNo"].append(race_result["RegNo"])
-        new_runners[class_desc][f"{r_id}-Place"].append(race_result["Place"])
-        new_runners[class_desc][f"{r_id}-Points"].append(race_result["Points"])
+        for pos, name, class_desc in unreg.loc[
+            ~(unreg_new_mask | unreg_existing_mask), ["pos", "Name", "ClassDesc"]
+        ].itertuples(index=False)
+    )
+    for _, message, args in sorted(warnings, key=lambda w: w[0]):
+        logging.warning(message, *args)
+
+    # New runners get ids in order of their appearance in the race
+    new_runners = pd.concat([reg_new, unreg_new]).sort_values("pos")
+    next_id = runners["runner"].max() + 1 if len(runners) else 0
+    new_runners["runner"] = range(next_id, next_id + len(new_runners))
+
+    # If a runner is matched more than once, the last result is kept
+    race_entries = (
+        pd.concat([reg_assigned, unreg_assigned, new_runners])
+        .sort_values("pos", kind="stable")
+        .drop_duplicates("runner", keep="last")
+        .astype({"runner": int})
+        .assign(race=r_id)
+    )
+    return (
+        new_runners[["runner", "ClassDesc", "Name", "RegNo"]],
+        race_entries[["runner", "ClassDesc", "race", "Place", "Points"]],
+    )
 
 
-def _merge_new_runners(
-    ovr_results: dict[str, pd.DataFrame],
-    new_runners: dict[str, dict[str, list[Any]]],
+def _build_results_matrix(
+    runners: pd.DataFrame, entries: pd.DataFrame, race_ids: list[int]
 ) -> dict[str, pd.DataFrame]:
-    """Merge new runners into overall results."""
+    """
+    Create overall results (runner x race matrix) for every category.
+
+    Returns
+    -------
+    DataFrame for every category with Name, RegNo and <id>-Place and <id>-Points
+    columns for every race. Runners are in order of their first appearance.
+    """
+    columns_list = ["Name", "RegNo"]
+    for r_id in race_ids:
+        columns_list.extend([f"{r_id}-Place", f"{r_id}-Points"])
+
+    ovr_results = {}
     for class_desc in CATEGORIES:
-        ovr_results[class_desc] = pd.concat(
-            [
-                ovr_results[class_desc],
-                pd.DataFrame.from_dict(new_runners[class_desc]),
-            ],
-            ignore_index=True,
-            sort=False,
-        )
+        cat_runners = runners[runners["ClassDesc"] == class_desc].sort_values("runner")
+        cat_entries = entries[entries["ClassDesc"] == class_desc]
+        row_of_runner = pd.Series(range(len(cat_runners)), index=cat_runners["runner"])
+
+        data = {
+            "Name": cat_runners["Name"].to_numpy(dtype=object),
+            "RegNo": cat_runners["RegNo"].to_numpy(dtype=object),
+        }
+        for r_id in race_ids:
+            race_entries = cat_entries[cat_entries["race"] == r_id]
+            rows = row_of_runner[race_entries["runner"]].to_numpy(dtype=int)
+            for col in ["Place", "Points"]:
+                values = np.full(len(cat_runners), np.nan, dtype=object)
+                values[rows] = race_entries[col].to_numpy(dtype=object)
+                data[f"{r_id}-{col}"] = values
+        ovr_results[class_desc] = pd.DataFrame(data, columns=columns_list)
     return ovr_results
 
 
 def _get_filenames_and_ids(season: str) -> tuple[list[Path], list[int]]:
+    """Get points files of races and their ORIS ids (sorted by ORIS id)."""
     season_dir = Path(f"data/{season}/results")
-    filenames = list(season_dir.glob("points_*.csv"))
+    filenames = sorted(season_dir.glob("points_*.csv"), key=lambda f: int(f.stem[7:]))
     race_ids = [int(f.stem[7:]) for f in filenames]
     return filenames, race_ids
 
 
 def _solve_duplicates(
     input_results: dict[str, pd.DataFrame],
+    decisions: dict[str, dict[str, dict[str, Any]]],
+    undecided: list[pd.DataFrame] | None = None,
 ) -> dict[str, pd.DataFrame]:
+    """
+    Merge probable duplicate runners in every category.
+
+    Parameters
+    ----------
+    input_results
+        Overall results of every category.
+    decisions
+        Journal of manual decisions per category (new decisions are added).
+    undecided, optional
+        If given, groups of runners that need a manual decision are collected
+        here (and kept separated) instead of asking the user.
+    """
     output_results = {}
 
     # Iterate through all categories and try to merge probable duplicates
     for class_desc in CATEGORIES:
         output_results[class_desc] = _solve_duplicates_category(
-            input_results[class_desc]
+            input_results[class_desc],
+            decisions.setdefault(class_desc, {}),
+            undecided,
         )
     return output_results
 
 
 def _solve_duplicates_category(
     class_results: pd.DataFrame,
+    decisions: dict[str, dict[str, Any]],
+    undecided: list[pd.DataFrame] | None = None,
 ) -> pd.DataFrame:
     # Unify name (Lowercase names without diacritics matches and trailing spaces)
     class_results["Name"] = class_results["Name"].str.strip()
-    class_results["name_unified"] = class_results["Name"].apply(
-        lambda x: udc.unidecode(x).lower()
-    )
-    dfs = []
-    for _, group in class_results.groupby("name_unified"):
-        # No duplicates, nothing to do
-        if len(group) == 1:
-            dfs.append(group.drop(columns=["name_unified"]))
-            continue
-
-        result = _apply_duplicate_resolution_rules(group)
-        dfs.extend(result)
+    class_results["name_unified"] = get_name_keys(class_results["Name"])
+    # Group runners with equal or similar names (candidates of duplicates)
+    groups = group_candidates(class_results.index, find_candidate_pairs(class_results))
+    # Runners without a candidate - no duplicates, nothing to do
+    is_duplicate = groups.duplicated(keep=False)
+    dfs = [class_results[~is_duplicate]]
+    for _, candidates in class_results[is_duplicate].groupby(groups[is_duplicate]):
+        # Runners with equal names first, then the remaining similar ones
+        resolved = []
+        for _, group in candidates.groupby("name_unified", sort=False):
+            if len(group) == 1:
+                resolved.append(group)
+                continue
+            result = _apply_duplicate_resolution_rules(group, decisions, undecided)
+            resolved.extend(
+                df.assign(name_unified=get_name_keys(df["Name"])) for df in result
+            )
+        if len(resolved) > 1:
+            result = _apply_similar_names_rules(
+                pd.concat(resolved), decisions, undecided
+            )
+            resolved = [
+                df.assign(name_unified=get_name_keys(df["Name"])) for df in result
+            ]
+        dfs.extend(resolved)
 
-    df = pd.concat(dfs)
+    # Keep runners ordered by unified name (stable - merged runners keep order)
+    df = (
+        pd.concat(dfs)
+        .sort_values("name_unified", kind="stable")
+        .drop(columns=["name_unified"])
+    )
     return df
 
 
-def _apply_duplicate_resolution_rules(group: pd.DataFrame) -> list[pd.DataFrame]:
+def _apply_duplicate_resolution_rules(
+    group: pd.DataFrame,
+    decisions: dict[str, dict[str, Any]],
+    undecided: list[pd.DataFrame] | None = None,
+) -> list[pd.DataFrame]:
     """Apply cascade of decision rules to resolve duplicates."""
     # Rule 0: two different results in one race
     if _check_same_race_rule(group):
@@ -260,12 +421,32 @@ def _apply_duplicate_resolution_rules(group: pd.DataFrame) -> list[pd.DataFrame]
         return [_merge_runners(group, ids_2_merge, main_id)]
 
     # Rule 4: manual decision
-    return _manual_decision_rule(group)
+    return _manual_decision_rule(group, decisions, undecided)
+
+
+def _apply_similar_names_rules(
+    group: pd.DataFrame,
+    decisions: dict[str, dict[str, Any]],
+    undecided: list[pd.DataFrame] | None = None,
+) -> list[pd.DataFrame]:
+    """
+    Apply decision rules to resolve runners with similar (not equal) names.
+
+    Only rules keeping the runners separated are applied automatically, merging
+    of runners with different names has to be decided manually.
+    """
+    # Rule 0: two different results in one race
+    # Rule 2: different years of birth
+    if _check_same_race_rule(group) or _check_yob_rule(group):
+        return [group.drop(columns=["name_unified"])]
+
+    # Rule 4: manual decision
+    return _manual_decision_rule(group, decisions, undecided)
 
 
 def _check_same_race_rule(group: pd.DataFrame) -> bool:
     """Check if runners have different results in the same race."""
-    for race_col in group.columns[2:]:
+    for race_col in group.columns[2:-1]:  # without Name, RegNo and name_unified
         if group[race_col].dropna().nunique() >= 2:
             logging.info(
                 "These runners will be kept separated (they both ran in the same "
@@ -296,7 +477,7 @@ def _check_regno_rule(group: pd.DataFrame) -> tuple[pd.Index, int] | None:
 
 def _check_yob_rule(group: pd.DataFrame) -> bool:
     """Check if runners have different years of birth."""
-    yob = group["RegNo"].apply(get_yob)
+    yob = get_yob(group["RegNo"])
     if yob.notna().all() and not yob.eq(yob.iloc[0]).all():
         logging.info(
             "These runners will be kept separated (they have different "
@@ -330,18 +511,44 @@ def _check_appearances_rule(group: pd.DataFrame) -> tuple[pd.Index, int] | None:
     return None
 
 
-def _manual_decision_rule(group: pd.DataFrame) -> list[pd.DataFrame]:
-    """Ask user to manually resolve duplicate runners."""
-    typer.echo(70 * "=")
-    typer.echo("I'm not able to decide these possible duplicate runners automatically:")
-    typer.echo(group.T.to_markdown())
-    typer.echo("WHAT TO DO? (choose one of the following options):")
-    typer.echo(
-        "--> Merge all runners and keep selected Name and RegNo (<id>)\n"
-        "--> Keep all runners separated (s)\n"
-        "--> Merge selected runners (write comma-separated ids - main first)?"
-    )
-    decision = input("> ")
+def _manual_decision_rule(
+    group: pd.DataFrame,
+    decisions: dict[str, dict[str, Any]],
+    undecided: list[pd.DataFrame] | None = None,
+) -> list[pd.DataFrame]:
+    """
+    Ask user to manually resolve duplicate runners.
+
+    The decision is stored in `decisions` and reused when the same group of
+    runners needs to be resolved again. If `undecided` is given, the user isn't
+    asked, the group is added to it and runners are kept separated.
+    """
+    fingerprint = _group_fingerprint(group)
+    decision = _replay_decision(group, decisions.get(fingerprint))
+    if decision is not None:
+        logging.info(
+            "Using previous manual decision '%s' for these runners:\n%s",
+            decision,
+            group.T.to_markdown(),
+        )
+    elif undecided is not None:
+        undecided.append(group.drop(columns=["name_unified"]))
+        return [group.drop(columns=["name_unified"])]
+    else:
+        typer.echo(70 * "=")
+        typer.echo(
+            "I'm not able to decide these possible duplicate runners automatically:"
+        )
+        typer.echo(group.T.to_markdown())
+        typer.echo("WHAT TO DO? (choose one of the following options):")
+        typer.echo(
+            "--> Merge all runners and keep selected Name and RegNo (<id>)\n"
+            "--> Keep all runners separated (s)\n"
+            "--> Merge selected runners (write comma-separated ids - main first)?"
+        )
+        decision = input("> ")
+        decisions[fingerprint] = _record_decision(group, decision)
+
     if decision == "s":
         return [group.drop(columns=["name_unified"])]
     if "," in decision:
@@ -354,6 +561,69 @@ def _manual_decision_rule(group: pd.DataFrame) -> list[pd.DataFrame]:
     return [_merge_runners(group, ids_2_merge, main_id)]
 
 
+def _runner_identity(group: pd.DataFrame, runner_id: int) -> list[str]:
+    """Get identity (Name and RegNo) of a runner, which doesn't depend on row ids."""
+    return [str(group.loc[runner_id, "Name"]), str(group.loc[runner_id, "RegNo"])]
+
+
+def _group_fingerprint(group: pd.DataFrame) -> str:
+    """Get a stable fingerprint of a group of possibly duplicate runners."""
+    identities = sorted(_runner_identity(group, runner_id) for runner_id in group.index)
+    return hashlib.sha1(json.dumps(identities).encode()).hexdigest()
+
+
+def _record_decision(group: pd.DataFrame, decision: str) -> dict[str, Any]:
+    """
+    Translate a manual decision (with row ids) to runners' identities.
+
+    Identities of all runners of the group are recorded too, so the journal
+    can be reviewed (and edited) by hand.
+    """
+    runners = sorted(_runner_identity(group, runner_id) for runner_id in group.index)
+    if decision == "s":
+        return {"runners": runners, "separate": True}
+    if "," in decision:
+        ids_2_merge = [int(x) for x in decision.split(",")]
+        return {
+            "runners": runners,
+            "merge": [_runner_identity(group, i) for i in ids_2_merge],
+            "merge_all": False,
+        }
+    return {
+        "runners": runners,
+        "merge": [_runner_identity(group, int(decision))],
+        "merge_all": True,
+    }
+
+
+def _replay_decision(
+    group: pd.DataFrame, recorded: dict[str, Any] | None
+) -> str | None:
+    """
+    Translate a recorded decision back to a manual decision with current row ids.
+
+    Returns
+    -------
+    Decision in the same format as the user's input or None if there is no
+    (applicable) recorded decision.
+    """
+    if recorded is None:
+        return None
+    if recorded.get("separate"):
+        return "s"
+    id_by_identity = {
+        tuple(_runner_identity(group, runner_id)): runner_id
+        for runner_id in group.index
+    }
+    try:
+        ids = [id_by_identity[tuple(identity)] for identity in recorded["merge"]]
+    except KeyError:
+        return None
+    if recorded["merge_all"]:
+        return str(ids[0])
+    return ",".join(str(i) for i in ids)
+
+
 def _merge_runners(
     group: pd.DataFrame, ids_2_merge: pd.Index, main_id: int
 ) -> pd.DataFrame:
@@ -364,33 +634,31 @@ def _merge_runners(
     for col in group.columns[2:-1]:  # without Name, RegNo and name_unified
         notna = group.loc[ids_2_merge, col].dropna()
         if notna.empty:
-            merged_runner_data[col] = pd.NA
+            merged_runner_data[col] = np.nan
         elif (len(notna) == 1) or ((notna == notna.iloc[0]).all()):
             merged_runner_data[col] = notna.iloc[0]
         else:
             raise ValueError("You are probably merging people that you shouldn't.")
-    return pd.DataFrame(merged_runner_data, index=[0])
+    return pd.DataFrame(merged_runner_data, index=[main_id])
 
 
 def _best_n_races(results: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Sum points of the best N races (N = half of all races + 1) of each runner."""
     for class_desc in CATEGORIES:
         race_columns = results[class_desc].columns[2:]
         num_of_all_races = len(race_columns) // 2
         num_of_races_to_count = (num_of_all_races // 2) + 1
 
-        total_points = []
-        for _, runner in results[class_desc].iterrows():
-            points = []
-            total_points.append(0)
-            for descriptor in race_columns:
-                if "Points" in descriptor:
-                    if pd.notna(runner[descriptor]):
-                        points.append(int(runner[descriptor]))
-                    else:
-                        points.append(0)
-            for race_points in sorted(points, reverse=True)[:num_of_races_to_count]:
-                total_points[-1] += race_points
-        results[class_desc][f"Best{num_of_races_to_count}-Points"] = total_points
+        points_columns = [col for col in race_columns if "Points" in col]
+        points = (
+            results[class_desc][points_columns]
+            .apply(pd.to_numeric)
+            .fillna(0)
+            .to_numpy(dtype=np.int64)
+        )
+        results[class_desc][f"Best{num_of_races_to_count}-Points"] = _best_n_sum(
+            points, num_of_races_to_count
+        )
         results[class_desc] = (
             results[class_desc]
             .sort_values(f"Best{num_of_races_to_count}-Points", ascending=False)
@@ -399,17 +667,74 @@ def _best_n_races(results: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
     return results
 
 
+def _best_n_sum(points: np.ndarray, n: int) -> np.ndarray:
+    """
+    Sum the N highest values in every row of a points matrix.
+
+    Parameters
+    ----------
+    points
+        Matrix of points (runners x races), missing results are zeros.
+    n
+        Number of races to count.
+
+    Returns
+    -------
+    Sum of the best N points of every runner.
+    """
+    num_of_races = points.shape[1]
+    if n >= num_of_races:
+        return points.sum(axis=1)
+    # Partial sort - the N highest values end up in the last N columns
+    return np.partition(points, num_of_races - n, axis=1)[:, num_of_races - n :].sum(
+        axis=1
+    )
+
+
 def _assign_overall_place(results: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
-    """Assign overall place to each runner."""
+    """Assign overall place to each runner (runners with equal points share a place)."""
     output_results = {}
     for class_desc in CATEGORIES:
         df = results[class_desc]
         best_n_col = df.filter(regex=r"Best.*").columns[0]
-
-        # Create a helper function to avoid binding loop variable
-        def _get_place(points, points_list=df[best_n_col].tolist()):
-            return points_list.index(points) + 1
-
-        df["place"] = df[best_n_col].apply(_get_place)
+        df["place"] = (
+            df[best_n_col].rank(method="min", ascending=False).astype(np.int64)
+        )
         output_results[class_desc] = df
     return output_results
+
+
+def _assign_medals(results: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """
+    Infer gender of each runner and assign medals to the top 3 runners.
+
+    In categories Z and V the top 3 men and the top 3 women get medals (ties
+    are broken by order of the results), in other categories places 1-3 get
+    medals. Gender is stored in the 'female' column, medals ('gold', 'silver',
+    'bronze' or empty) in the 'medal' column.
+    """
+    for class_desc in CATEGORIES:
+        df = results[class_desc]
+        df["female"] = _is_female(df["RegNo"], df["Name"])
+        if class_desc in MEDALS_BY_GENDER_CATEGORIES:
+            rank = (
+                df.sort_values("place", kind="stable").groupby("female").cumcount()
+            ).reindex(df.index)
+        else:
+            rank = df["place"] - 1
+        df["medal"] = rank.map(dict(enumerate(MEDALS))).fillna("")
+    return results
+
+
+def _is_female(reg_nos: pd.Series, names: pd.Series) -> pd.Series:
+    """
+    Infer female from RegNo (third digit >= 5) or fall back to surname.
+
+    Runners without a valid RegNo (e.g. 'nereg.') are female if their surname
+    (the first word of the name) ends with 'á' (e.g. '-ová').
+    """
+    digits = reg_nos.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+    female_by_reg_no = pd.to_numeric(digits.str[2], errors="coerce") >= 5
+    surnames = names.fillna("").astype(str).str.strip().str.split().str[0]
+    female_by_name = surnames.fillna("").str.endswith("á")
+    return female_by_reg_no.where(digits.str.len() >= 3, female_by_name).astype(bool)
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from results_calculator.files import write_if_changed
+
+
+class OverallState:
+    """
+    Intermediate state of the overall results calculation of a season.
+
+    It's stored next to the overall results so a following run can process
+    only new or changed race results.
+
+    Attributes
+    ----------
+    race_ids
+        ORIS ids of processed races in order of processing.
+    file_hashes
+        Content hash of the 'points_<id>.csv' file of every processed race.
+    runners
+        Identity table ('runner' id, ClassDesc, Name, RegNo and 'race' of the
+        runner's first appearance).
+    entries
+        Race results of runners ('runner' id, ClassDesc, race, Place, Points).
+
+    """
+
+    def __init__(
+        self,
+        race_ids: list[int],
+        file_hashes: dict[int, str],
+        runners: pd.DataFrame,
+        entries: pd.DataFrame,
+    ) -> None:
+        """
+        Initialize the state.
+
+        Parameters
+        ----------
+        race_ids
+            ORIS ids of processed races in order of processing.
+        file_hashes
+            Content hash of the 'points_<id>.csv' file of every processed race.
+        runners
+            Identity table of runners.
+        entries
+            Race results of runners.
+
+        """
+        self.race_ids = race_ids
+        self.file_hashes = file_hashes
+        self.runners = runners
+        self.entries = entries
+
+    def unchanged_races(
+        self, race_ids: list[int], file_hashes: dict[int, str]
+    ) -> list[int]:
+        """
+        Get the longest prefix of races that were processed in the same order
+        and whose results didn't change.
+
+        Identity of runners depends on the order of races, so all races after
+        a changed (removed or newly inserted) one have to be processed again.
+
+        Parameters
+        ----------
+        race_ids
+            ORIS ids of all current races in order of processing.
+        file_hashes
+            Current content hash of the 'points_<id>.csv' file of every race.
+
+        Returns
+        -------
+        ORIS ids of races that don't have to be processed again.
+
+        """
+        unchanged = []
+        for r_id, processed_id in zip(race_ids, self.race_ids):
+            if r_id != processed_id or file_hashes.get(r_id) != self.file_hashes.get(
+                r_id
+            ):
+                break
+            unchanged.append(r_id)
+        return unchanged
+
+
+def state_path(season: str) -> Path:
+    """Get path to the file with the overall results state of a season."""
+    return Path(f"data/{season}/results/overall_state.pkl")
+
+
+def load_state(season: str) -> OverallState | None:
+    """
+    Load the overall results state of a season.
+
+    Returns
+    -------
+    Stored state or None if there is no (readable) state.
+
+    """
+    path = state_path(season)
+    try:
+        with path.open("rb") as f:
+            state = pickle.load(f)
+    except FileNotFoundError:
+        logging.info("No previous state of season '%s' found.", season)
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError) as e:
+        logging.warning("State file '%s' is corrupted, ignoring it.\n%s", path, e)
+        return None
+    return state
+
+
+def save_state(season: str, state: OverallState) -> None:
+    """Store the overall results state of a season (atomically)."""
+    path = state_path(season)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def decisions_path(season: str) -> Path:
+    """Get path to the journal of manual decisions about duplicates of a season."""
+    return Path(f"data/{season}/results/decisions.json")
+
+
+def load_decisions(season: str) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    Load the journal of manual decisions about duplicate runners of a season.
+
+    Returns
+    -------
+    Decisions per category, keyed by fingerprint of the group of runners
+    (empty if there is no journal yet).
+
+    """
+    path = decisions_path(season)
+    try:
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logging.error("Decisions journal '%s' is corrupted!\n%s", path, e)
+        raise
+
+
+def save_decisions(
+    season: str, decisions: dict[str, dict[str, dict[str, Any]]]
+) -> None:
+    """Store the journal of manual decisions (unchanged journal isn't rewritten)."""
+    path = decisions_path(season)
+    decisions = {class_desc: d for class_desc, d in decisions.items() if d}
+    if not decisions and not path.exists():
+        return
+    content = json.dumps(decisions, indent=2, ensure_ascii=False, sort_keys=True)
+    if write_if_changed(path, content + "\n"):
+        logging.info("Manual decisions saved to '%s'", path)
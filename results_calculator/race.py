@@ -1,25 +1,45 @@
+import gzip
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pandas as pd
 import requests
 import typer
-from pandas._libs.missing import NAType
+import unidecode as udc
 
 from results_calculator.cli import app
+from results_calculator.files import write_if_changed
+from results_calculator.scoring import SCORING_SCHEMES, get_points, load_points_table
+from src import oris
 
 HDD_MAX_YEAR = datetime.now().year - 11 + (datetime.now().month > 6)
 ZV_KID_YEAR = datetime.now().year - 15 + (datetime.now().month > 6)
 ZV_VET_YEAR = datetime.now().year - 51 + (datetime.now().month > 6)
 
+# Number of retries of failed requests to ORIS
+ORIS_RETRIES = 3
+
+# Archived ORIS API methods and their parameter with ORIS ID of a race
+RAW_METHODS = {"getEvent": "id", "getEventResults": "eventid"}
+
 
 @app.command()
 def race(
-    oris_id: int,
-    output_dir: Path = typer.Option(
-        Path("./"), "--output-dir", "-o", help="Output directory"
+    races: list[str] = typer.Argument(
+        ..., help="ORIS IDs of races or a season (e.g. '24-25') to process."
+    ),
+    output_dir: Path | None = typer.Option(
+        None,
+        "--output-dir",
+        "-o",
+        help="Output directory (default: current directory for ORIS IDs, "
+        "'data/<season>/results' for a season)",
     ),
     known_unregs_file: Path = typer.Option(
         Path("./data/known_unregs.json"),
@@ -27,96 +47,398 @@ def race(
         "-u",
         help="File with list of known unregistered runners and their year of birth.",
     ),
+    offline: bool = typer.Option(
+        False,
+        "--offline",
+        help="Don't connect to ORIS, use archived ORIS responses instead.",
+    ),
+    scheme: str | None = typer.Option(
+        None,
+        "--scheme",
+        "-s",
+        help="Scoring scheme to use instead of the one configured for the season "
+        f"(one of: {', '.join(SCORING_SCHEMES)}).",
+    ),
 ) -> None:
     """
-    Fetch results of a single race from ORIS and save them to a CSV file.
+    Fetch results of races from ORIS and save them to CSV files.
+
+    Races are fetched concurrently (over a shared connection pool), scored and
+    each race is saved to a 'points_<oris_id>.csv' file. A summary of all
+    processed races is printed at the end.
+
+    Raw ORIS responses are archived (gzipped) in 'data/<season>/raw' (or in
+    '<output_dir>/raw' if the race isn't in any season), so the races can be
+    scored again without ORIS ('--offline').
+
+    Points are assigned by the scoring scheme of the race's season (see
+    `load_points_table`) unless a scheme is given explicitly.
 
     Parameters
     ----------
-    oris_id
-        ORIS ID of the race.
+    races
+        ORIS IDs of the races or a season. For a season, all BZL races with
+        ORIS ID from its event configs are processed.
     output_dir, optional
-        Output directory. If not provided, the current working directory will be used.
+        Output directory. If not provided, the current working directory
+        (or results directory of the season) will be used.
     known_unregs_file
         File with list of known unregistered runners and their year of birth.
+    offline
+        Score races from archived ORIS responses (no network access).
+    scheme, optional
+        Name of a predefined scoring scheme overriding the seasons' schemes.
     """
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if len(races) == 1 and not races[0].isdigit():
+        season = races[0]
+        oris_ids = get_season_race_ids(season)
+        if output_dir is None:
+            output_dir = Path(f"data/{season}/results")
+        race_seasons = {oris_id: season for oris_id in oris_ids}
+    else:
+        try:
+            oris_ids = [int(oris_id) for oris_id in races]
+        except ValueError:
+            logging.error("Give either ORIS IDs of races or a single season.")
+            raise typer.Exit(code=1)
+        if output_dir is None:
+            output_dir = Path("./")
+        race_seasons = get_race_seasons()
+    raw_dirs = {
+        oris_id: (
+            Path(f"data/{race_seasons[oris_id]}/raw")
+            if oris_id in race_seasons
+            else output_dir / "raw"
+        )
+        for oris_id in oris_ids
+    }
     try:
-        with known_unregs_file.open() as f:
-            known_unregs = json.load(f)
-    except FileNotFoundError:
-        logging.warning(
-            "File '%s' not found! Assuming no unregistered runners.",
-            known_unregs_file,
+        points_tables = {
+            season: load_points_table(season, scheme)
+            for season in {race_seasons.get(oris_id) for oris_id in oris_ids}
+        }
+    except KeyError as e:
+        logging.error("Unknown scoring scheme %s!", e)
+        raise typer.Exit(code=1)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    known_unregs = index_known_unregs(load_known_unregs(known_unregs_file))
+
+    session = None if offline else oris.create_session(retries=ORIS_RETRIES)
+    with ThreadPoolExecutor(max_workers=oris.MAX_WORKERS) as executor:
+        summary = list(
+            executor.map(
+                lambda oris_id: _process_race(
+                    oris_id,
+                    output_dir,
+                    known_unregs,
+                    points_tables[race_seasons.get(oris_id)],
+                    session,
+                    raw_dirs[oris_id],
+                ),
+                oris_ids,
+            )
         )
-        known_unregs = []
 
-    # First, get name and date of the race
-    url = (
-        "https://oris.orientacnisporty.cz/API/"
-        f"?format=json&method=getEvent&id={oris_id}"
-    )
+    typer.echo(pd.DataFrame(summary).to_markdown(index=False))
+    if any(race_summary["Status"] == "failed" for race_summary in summary):
+        raise typer.Exit(code=1)
+
+
+def get_season_race_ids(season: str) -> list[int]:
+    """
+    Get ORIS IDs of all BZL races of a season (from its event configs).
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g. '24-25').
+
+    Returns
+    -------
+    ORIS IDs of BZL races of the season (sorted).
+    """
+    oris_ids = []
+    for event_file in Path(f"data/{season}/events").glob("*.json"):
+        with event_file.open() as f:
+            config = json.load(f)
+        if config.get("is_bzl") and config.get("oris_id"):
+            oris_ids.append(int(config["oris_id"]))
+    if not oris_ids:
+        logging.warning("No BZL races with ORIS ID found in season '%s'.", season)
+    return sorted(oris_ids)
+
+
+def get_race_seasons() -> dict[int, str]:
+    """
+    Get season of every event with ORIS ID (from event configs).
+
+    Returns
+    -------
+    ORIS IDs of events as keys, seasons (e.g. '24-25') as values.
+    """
+    race_seasons = {}
+    for event_file in Path("data").glob("*-*/events/*.json"):
+        with event_file.open() as f:
+            config = json.load(f)
+        if config.get("oris_id"):
+            race_seasons[int(config["oris_id"])] = event_file.parents[1].name
+    return race_seasons
+
+
+def _process_race(
+    oris_id: int,
+    output_dir: Path,
+    known_unregs: pd.DataFrame,
+    points_table: np.ndarray,
+    session: requests.Session | None,
+    raw_dir: Path,
+) -> dict[str, Any]:
+    """
+    Fetch results of a single race from ORIS, score them and save them.
+
+    Parameters
+    ----------
+    oris_id
+        ORIS ID of the race.
+    output_dir
+        Output directory.
+    known_unregs
+        Registry of known unregistered runners (see `index_known_unregs`).
+    points_table
+        Points for places 1, 2, 3, ... (see `load_points_table`).
+    session
+        HTTP session (connection pool) used for requests to ORIS. If None,
+        archived ORIS responses are used instead.
+    raw_dir
+        Directory with archived ORIS responses.
+
+    Returns
+    -------
+    Summary of the race (ORIS ID, name, date, status, number of results and
+    output file).
+    """
+    summary: dict[str, Any] = {
+        "ORIS ID": oris_id,
+        "Name": None,
+        "Date": None,
+        "Status": "failed",
+        "Results": 0,
+        "Output": None,
+    }
+
     try:
-        response = requests.get(url)
-        race_metadata = response.json()
-    except requests.exceptions.ConnectionError:
-        logging.error(
-            "Communication with ORIS failed. Check your internet connection please."
-        )
-        return
-    except requests.exceptions.HTTPError as e:
-        logging.error("ORIS returned an error: %s", e)
-        return
-
-    if race_metadata["Status"] == "OK":
-        name = race_metadata["Data"]["Name"]
-        date = race_metadata["Data"]["Date"]
-        logging.info("Event's name: %s", name)
-        logging.info("Event's date: %s", date)
-
-    # Get results
-    url = (
-        "https://oris.orientacnisporty.cz/API/"
-        f"?format=json&method=getEventResults&eventid={oris_id}"
-    )
+        if session is None:
+            race_metadata, results_data = load_archived_race(oris_id, raw_dir)
+        else:
+            race_metadata, results_data = fetch_race(oris_id, session, raw_dir)
+    except FileNotFoundError as e:
+        logging.error("Race %s is not archived!\n%s", oris_id, e)
+        return summary
+    except requests.RequestException as e:
+        logging.error("Communication with ORIS (race %s) failed!\n%s", oris_id, e)
+        return summary
+    except KeyError as e:
+        logging.error("ORIS returned unexpected data (race %s)!\n%s", oris_id, e)
+        return summary
+
+    if race_metadata:
+        summary["Name"] = race_metadata["Name"]
+        summary["Date"] = race_metadata["Date"]
+        logging.info("Event's name: %s", summary["Name"])
+        logging.info("Event's date: %s", summary["Date"])
+    if not results_data:
+        logging.warning("Race %s has no results (yet).", oris_id)
+        summary["Status"] = "no results"
+        return summary
+
     try:
-        response = requests.get(url)
-        results_data = response.json()
-    except requests.exceptions.ConnectionError:
+        df_results = score_race(results_data, known_unregs, points_table)
+    except (KeyError, ValueError) as e:
         logging.error(
-            "Communication with ORIS failed. Check your internet connection please."
+            "ERROR: Event DataFrame has a wrong format (e.g. result's ID is "
+            "missing or a value isn't a number). Please check that you used "
+            "correct ORIS id.\n%s",
+            e,
         )
-        return
-    except requests.exceptions.HTTPError as e:
-        logging.error("ORIS returned an error: %s", e)
-        return
+        return summary
 
-    # Create a dataframe from the results and clean it
-    columns_to_keep = ["ClassDesc", "Place", "Name", "RegNo", "UserID", "Time"]
-    try:
-        df_results = _clean_race_dataframe(
-            pd.DataFrame.from_dict(results_data["Data"], orient="index").set_index(
-                "ID"
-            )[columns_to_keep]
+    # Export to .csv (unchanged file is not rewritten)
+    output_file = output_dir / f"points_{oris_id}.csv"
+    if write_if_changed(output_file, df_results.to_csv(sep=",", index=False)):
+        logging.info(
+            "Event was processed successfully and exported to '%s'", output_file
         )
-    except KeyError as e:
-        logging.error(
-            "ERROR: Event DataFrame has a wrong format (result's ID is "
-            "missing). Please check that you used correct ORIS id.\n%s",
-            e,
+    else:
+        logging.info("Event was processed successfully, '%s' is unchanged", output_file)
+
+    summary.update(Status="OK", Results=len(df_results), Output=str(output_file))
+    return summary
+
+
+def fetch_race(
+    oris_id: int, session: requests.Session, raw_dir: Path | None = None
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """
+    Fetch info about a race and its results from ORIS.
+
+    Parameters
+    ----------
+    oris_id
+        ORIS ID of the race.
+    session
+        HTTP session (connection pool) used for requests to ORIS.
+    raw_dir
+        Directory for archiving of raw ORIS responses (not archived if None).
+
+    Returns
+    -------
+    Data of the race ('getEvent') and its results ('getEventResults').
+
+    Raises
+    ------
+    requests.RequestException
+        If the communication with ORIS fails.
+    KeyError
+        If ORIS returns unexpected data.
+    """
+    # First, get name and date of the race, then results
+    responses = {
+        method: oris.get_response(method, session, **{param: oris_id})
+        for method, param in RAW_METHODS.items()
+    }
+    if raw_dir is not None:
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        for method, response in responses.items():
+            content = json.dumps(response, ensure_ascii=False).encode()
+            write_if_changed(
+                _raw_path(raw_dir, oris_id, method), gzip.compress(content, mtime=0)
+            )
+    return responses["getEvent"]["Data"], responses["getEventResults"]["Data"]
+
+
+def load_archived_race(
+    oris_id: int, raw_dir: Path
+) -> tuple[dict[str, Any], dict[str, dict[str, Any]]]:
+    """
+    Load info about a race and its results from archived ORIS responses.
+
+    Parameters
+    ----------
+    oris_id
+        ORIS ID of the race.
+    raw_dir
+        Directory with archived ORIS responses.
+
+    Returns
+    -------
+    Data of the race ('getEvent') and its results ('getEventResults').
+
+    Raises
+    ------
+    FileNotFoundError
+        If the responses aren't archived.
+    KeyError
+        If the archived responses contain unexpected data.
+    """
+    responses = {
+        method: json.loads(
+            gzip.decompress(_raw_path(raw_dir, oris_id, method).read_bytes())
         )
-        return
+        for method in RAW_METHODS
+    }
+    return responses["getEvent"]["Data"], responses["getEventResults"]["Data"]
+
+
+def _raw_path(raw_dir: Path, oris_id: int, method: str) -> Path:
+    """Get path to an archived ORIS response."""
+    return raw_dir / f"{oris_id}_{method}.json.gz"
+
+
+def score_race(
+    results_data: dict[str, dict[str, Any]],
+    known_unregs: pd.DataFrame,
+    points_table: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """
+    Create table of race results with assigned points.
+
+    Parameters
+    ----------
+    results_data
+        Results of the race from ORIS ('getEventResults' data).
+    known_unregs
+        Registry of known unregistered runners (see `index_known_unregs`).
+    points_table, optional
+        Points for places 1, 2, 3, ... (default scoring scheme if not given).
+
+    Returns
+    -------
+    Cleaned results with ZV class split to Z and V and with points.
+
+    Raises
+    ------
+    KeyError
+        If the results have a wrong format.
+    """
+    # Create a dataframe from the results and clean it
+    columns_to_keep = ["ClassDesc", "Place", "Name", "RegNo", "UserID", "Time"]
+    df_results = _clean_race_dataframe(
+        pd.DataFrame.from_dict(results_data, orient="index").set_index("ID")[
+            columns_to_keep
+        ]
+    )
 
     # Split ZV class to Z and V
     df_results = _split_zv_class(df_results, known_unregs)
 
     # Assign points
-    df_results["Points"] = df_results["Place"].apply(_get_points)
+    if points_table is None:
+        points_table = load_points_table(None)
+    df_results["Points"] = get_points(df_results["Place"], points_table)
+    return df_results
 
-    # Export to .csv
-    output_file = output_dir / f"points_{oris_id}.csv"
-    df_results.to_csv(output_file, sep=",", index=False)
-    logging.info("Event was processed successfully and exported to '%s'", output_file)
+
+def load_known_unregs(known_unregs_file: Path) -> list[dict[str, str | int]]:
+    """Load list of known unregistered runners and their year of birth."""
+    try:
+        with known_unregs_file.open() as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logging.warning(
+            "File '%s' not found! Assuming no unregistered runners.",
+            known_unregs_file,
+        )
+        return []
+
+
+def index_known_unregs(known_unregs: list[dict[str, str | int]]) -> pd.DataFrame:
+    """
+    Create a registry of known unregistered runners indexed by normalized name.
+
+    If more runners have the same normalized name, the first one is kept.
+
+    Parameters
+    ----------
+    known_unregs
+        Known unregistered runners and their attributes (Name, yob, RegNo, ...).
+
+    Returns
+    -------
+    Attributes of known unregistered runners, normalized names as index.
+    """
+    registry = pd.DataFrame(known_unregs)
+    if registry.empty:
+        registry = pd.DataFrame(columns=["Name", "yob"])
+    registry = registry.astype({"yob": "Int64"})
+    registry.index = pd.Index(registry["Name"].map(normalize_name), name="name_key")
+    return registry[~registry.index.duplicated(keep="first")]
+
+
+@lru_cache(maxsize=None)
+def normalize_name(name: str) -> str:
+    """Normalize runner's name (lowercase, without diacritics and outer spaces)."""
+    return udc.unidecode(name).strip().lower()
 
 
 def _clean_race_dataframe(df: pd.DataFrame) -> pd.DataFrame:
@@ -136,104 +458,70 @@ def _clean_race_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def _split_zv_class(
-    df_all: pd.DataFrame, known_unregs: list[dict[str, str | int]]
-) -> pd.DataFrame:
+def _split_zv_class(df_all: pd.DataFrame, known_unregs: pd.DataFrame) -> pd.DataFrame:
     """Split ZV class to Z, V and other."""
     # Get year of birth from registration number
     df_zv = df_all[df_all["ClassDesc"] == "ZV"].copy()
-    df_zv["yob"] = df_zv["RegNo"].apply(get_yob)
-
-    # Try to find unregistered runners in the list of known unregs
-    for unreg in known_unregs:
-        if (
-            unreg["Name"] in df_zv["Name"].values
-            and len(df_zv[df_zv["Name"] == unreg["Name"]]) == 1
-        ):
-            # We know there is only one row with this name (from prev. check).
-            # The .all() method is required for proper type checking.
-            if df_zv.loc[df_zv["Name"] == unreg["Name"], "yob"].isna().all():
-                # Assign all known unreg's attributes to the row (yob, regno, etc.)
-                for key in unreg:
-                    df_zv.loc[df_zv["Name"] == unreg["Name"], key] = unreg[key]
+    df_zv["yob"] = get_yob(df_zv["RegNo"])
+
+    # Find runners without a year of birth (with a unique name in the race) in
+    # the registry of known unregs and assign them all known attributes
+    name_keys = df_zv["Name"].map(normalize_name)
+    is_known = (
+        ~name_keys.duplicated(keep=False)
+        & df_zv["yob"].isna()
+        & name_keys.isin(known_unregs.index)
+    )
+    if is_known.any():
+        known = known_unregs.reindex(name_keys[is_known]).set_axis(
+            df_zv.index[is_known]
+        )
+        # Assigned in place, so the rows stay in the finishing order
+        for column in known.columns:
+            values = known[column].dropna()
+            df_zv.loc[values.index, column] = values
 
     # Create Z class (zaci)
-    df_z = df_zv[df_zv["yob"].notna() & (df_zv["yob"] >= ZV_KID_YEAR)].reset_index()
+    df_z = df_zv[df_zv["yob"].notna() & (df_zv["yob"] >= ZV_KID_YEAR)].copy()
     df_z["ClassDesc"] = "Z"
 
     # Create V class (veterani)
-    df_v = df_zv[df_zv["yob"].notna() & (df_zv["yob"] <= ZV_VET_YEAR)].reset_index()
+    df_v = df_zv[df_zv["yob"].notna() & (df_zv["yob"] <= ZV_VET_YEAR)].copy()
     df_v["ClassDesc"] = "V"
 
     # Place all other participants in a separate class
     # (without standard registration number or out of age limits)
-    df_other = df_zv[
-        ~df_zv.index.isin(df_z["ID"]) & ~df_zv.index.isin(df_v["ID"])
-    ].reset_index()
-    df_other["ClassDesc"] = "ZV-other"
+    df_other = df_zv[~df_zv.index.isin(df_z.index) & ~df_zv.index.isin(df_v.index)]
+    df_other = df_other.assign(ClassDesc="ZV-other")
 
-    # Fix places in the splitted classes
+    # Fix places in the splitted classes (disqualified runners keep 'DISK')
     for df in [df_z, df_v]:
-        for i in range(len(df)):
-            if df.loc[i, "Place"] != "DISK":
-                df.loc[i, "Place"] = f"{i + 1}."
-
-    # Drop yob column
-    df_z = df_z.drop(columns=["yob"])
-    df_v = df_v.drop(columns=["yob"])
-    df_other = df_other.drop(columns=["yob"])
-
-    # Set ID as index
-    df_z = df_z.set_index("ID")
-    df_v = df_v.set_index("ID")
-    df_other = df_other.set_index("ID")
-
-    # Concatenate all dataframes
-    dfs = [df_all[df_all["ClassDesc"] != "ZV"], df_z, df_v, df_other]
+        finished = df["Place"] != "DISK"
+        df.loc[finished, "Place"] = finished.cumsum()[finished].astype(str) + "."
+
+    # Concatenate all dataframes (without yob column)
+    dfs = [
+        df_all[df_all["ClassDesc"] != "ZV"],
+        *(df.drop(columns=["yob"]) for df in [df_z, df_v, df_other]),
+    ]
     return pd.concat(dfs)
 
 
-def get_yob(reg_no: str) -> int | NAType:
-    """Get year of birth from registration number."""
-    if reg_no.isdigit() or "nereg" in reg_no:
-        return pd.NA
-    try:
-        year_str = reg_no[3:5]
-        if int(year_str) > datetime.now().year % 100:
-            return int("19" + year_str)
-        return int("20" + year_str)
-    except ValueError:
+def get_yob(reg_nos: pd.Series, log_errors: bool = True) -> pd.Series:
+    """
+    Get years of birth from registration numbers (e.g. 'ZBM0706' -> 2007).
+
+    Numeric registrations and 'nereg.' have no year of birth (pd.NA). Malformed
+    registration numbers are logged (unless `log_errors` is False).
+    """
+    is_standard = ~reg_nos.str.isdigit() & ~reg_nos.str.contains("nereg")
+    year_str = reg_nos.str[3:5].where(is_standard)
+    years = pd.to_numeric(
+        year_str.where(year_str.str.fullmatch(r"\d\d", na=False)), errors="coerce"
+    ).astype("Int64")
+    for reg_no in reg_nos[is_standard & years.isna()] if log_errors else []:
         logging.warning(
             "Error parsing year of birth from registration number: %s", reg_no
         )
-        return pd.NA
-
-
-def _get_points(place: str) -> int:
-    """
-    Transfer given place (str) to points by following rule.
-
-    1st place = 200p
-    2nd place = 190p
-    3rd place = 182p
-    4th place = 176p
-    5th place = 172p
-    6th place = 170p
-    7th place = 169p
-    8th place = 168p
-    ...
-    175th place = 1p
-    """
-    if place == "1.":
-        return 200
-    if place == "2.":
-        return 190
-    if place == "3.":
-        return 182
-    if place == "4.":
-        return 176
-    if place == "5.":
-        return 172
-    if place in {"DISK", "MS"} or int(place[:-1]) > 175:
-        return 0
-    return 176 - int(place[:-1])
+    is_last_century = (years > datetime.now().year % 100).astype("Int64")
+    return years + 2000 - 100 * is_last_century
@@ -0,0 +1,170 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import typer
+
+from results_calculator.cli import app
+from results_calculator.duplicates import get_name_keys, save_name_keys
+from results_calculator.files import file_hash, write_if_changed
+
+# Persistent index of results of all runners across all seasons
+RUNNER_INDEX_FILE = Path("data/runner_index.json")
+
+
+@app.command("runner-index")
+def runner_index(
+    full: bool = typer.Option(
+        False, "--full", "-f", help="Rebuild the whole index from scratch."
+    ),
+) -> None:
+    """
+    Update the index of results of every runner across all seasons.
+
+    Only points files that are new or changed since the last update are read.
+    Races whose points file was removed are dropped from the index.
+
+    Parameters
+    ----------
+    full
+        Rebuild the whole index (e.g. to resolve unregistered runners again).
+    """
+    index = {} if full else load_runner_index()
+    update_runner_index(index)
+    save_runner_index(index)
+    save_name_keys()
+
+
+def load_runner_index(path: Path = RUNNER_INDEX_FILE) -> dict[str, Any]:
+    """
+    Load the runner index.
+
+    The index contains
+    - 'sources': content hash of every indexed points file ('<season>/<race>'),
+    - 'names': normalized name mapped to RegNo of the only registered runner
+      with that name (None if there are more of them),
+    - 'runners': runner id (RegNo or slug of normalized name of unregistered runners)
+      mapped to the runner's name, RegNo and records of results
+      [season, race, category, place, points].
+
+    Returns
+    -------
+    Loaded index (empty if there is no index yet).
+    """
+    try:
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_runner_index(index: dict[str, Any], path: Path = RUNNER_INDEX_FILE) -> None:
+    """Store the runner index (unchanged index isn't rewritten)."""
+    content = json.dumps(
+        index, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    if write_if_changed(path, content + "\n"):
+        logging.info("Runner index exported to '%s'", path)
+    else:
+        logging.info("Runner index '%s' is unchanged", path)
+
+
+def update_runner_index(index: dict[str, Any], data_dir: Path = Path("data")) -> None:
+    """
+    Add new or changed points files of all seasons to the runner index.
+
+    The index is updated in place (see `load_runner_index` for its format).
+
+    Parameters
+    ----------
+    index
+        Runner index to update.
+    data_dir
+        Directory with data of all seasons.
+    """
+    sources: dict[str, str] = index.setdefault("sources", {})
+    names: dict[str, str | None] = index.setdefault("names", {})
+    runners: dict[str, dict[str, Any]] = index.setdefault("runners", {})
+
+    points_files = {
+        f"{f.parents[1].name}/{f.stem[7:]}": f
+        for f in sorted(data_dir.glob("*-*/results/points_*.csv"))
+    }
+    hashes = {source: file_hash(f) for source, f in points_files.items()}
+    outdated = {s for s, h in sources.items() if hashes.get(s) != h}
+    new = [s for s in points_files if sources.get(s) != hashes[s]]
+    if not outdated and not new:
+        logging.info("Runner index is up to date.")
+        return
+    logging.info(
+        "Updating runner index: %d removed or changed, %d new or changed race(s).",
+        len(outdated),
+        len(new),
+    )
+
+    # Drop records of removed or changed races
+    if outdated:
+        for runner_id in list(runners):
+            runner = runners[runner_id]
+            runner["records"] = [
+                record
+                for record in runner["records"]
+                if f"{record[0]}/{record[1]}" not in outdated
+            ]
+            if not runner["records"]:
+                del runners[runner_id]
+        for source in outdated:
+            del sources[source]
+
+    if not new:
+        return
+    df = pd.concat(
+        [
+            pd.read_csv(
+                points_files[source],
+                usecols=["ClassDesc", "Place", "Name", "RegNo", "Points"],
+                dtype={"Place": str, "RegNo": str},
+            ).assign(season=source.split("/")[0], race=int(source.split("/")[1]))
+            for source in new
+        ],
+        ignore_index=True,
+    )
+    df["Name"] = df["Name"].str.strip()
+    df["RegNo"] = df["RegNo"].fillna("nereg.").str.strip()
+    df["name_key"] = get_name_keys(df["Name"])
+    registered = df["RegNo"].str.len().eq(7) & df["RegNo"].str[0].between("A", "Z")
+
+    # Names of registered runners (ambiguous names map to None)
+    for name_key, reg_nos in df[registered].groupby("name_key")["RegNo"]:
+        unique_reg_nos: set[str | None] = set(reg_nos)
+        if name_key in names:
+            unique_reg_nos.add(names[name_key])
+        names[name_key] = unique_reg_nos.pop() if len(unique_reg_nos) == 1 else None
+
+    # Unregistered runners are identified by the only registered runner with
+    # the same name or by their normalized name (e.g. 'novak-jan')
+    df["runner_id"] = df["RegNo"].where(
+        registered,
+        df["name_key"].map(names).fillna(df["name_key"].str.replace(" ", "-")),
+    )
+    df["registered"] = registered
+    df = df.sort_values(["season", "race"], kind="stable")
+    records = df[["season", "race", "ClassDesc", "Place", "Points"]].to_numpy().tolist()
+    for runner_id, name, reg_no, is_registered, record in zip(
+        df["runner_id"], df["Name"], df["RegNo"], df["registered"], records
+    ):
+        runner = runners.setdefault(
+            runner_id, {"name": name, "reg_no": reg_no, "records": []}
+        )
+        # The latest name and RegNo of the runner are kept (preferably registered)
+        if is_registered or runner["reg_no"] != runner_id:
+            runner["name"], runner["reg_no"] = name, reg_no
+        runner["records"].append(
+            [record[0], int(record[1]), record[2], record[3], int(record[4])]
+        )
+    for runner in runners.values():
+        runner["records"].sort(key=lambda record: (record[0], record[1]))
+
+    sources.update({source: hashes[source] for source in new})
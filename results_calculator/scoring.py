@@ -0,0 +1,88 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Points for places 1, 2, 3, ... (places beyond the table get no points)
+SCORING_SCHEMES: dict[str, list[int]] = {
+    # 200, 190, 182, 176, 172, 170, 169, 168, ..., 1 (175th place)
+    "bzl": [200, 190, 182, 176, 172, *range(170, 0, -1)],
+}
+DEFAULT_SCHEME = "bzl"
+
+# Places which never get points (disqualified, did not finish)
+NO_POINTS_PLACES = ["DISK", "MS"]
+
+
+def load_points_table(season: str | None, scheme: str | None = None) -> np.ndarray:
+    """
+    Get points table of a season.
+
+    The scoring scheme of a season is configured in 'data/<season>/scoring.json'
+    either by name of a predefined scheme (``{"scheme": "bzl"}``) or by points
+    for places 1, 2, 3, ... (``{"points": [100, 80, 60]}``). Seasons without
+    the file use the default scheme.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g. '24-25') or None for the default scheme.
+    scheme, optional
+        Name of a predefined scheme overriding the season's configuration.
+
+    Returns
+    -------
+    Points for places 1, 2, 3, ... (index 0 = 1st place).
+
+    Raises
+    ------
+    KeyError
+        If the scheme is unknown.
+    """
+    if scheme is not None:
+        return np.array(SCORING_SCHEMES[scheme], dtype=np.int64)
+    config = {}
+    if season is not None:
+        config_file = Path(f"data/{season}/scoring.json")
+        try:
+            with config_file.open(encoding="utf-8") as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            pass
+    if "points" in config:
+        logging.info("Using custom scoring scheme of season '%s'.", season)
+        return np.array(config["points"], dtype=np.int64)
+    return np.array(
+        SCORING_SCHEMES[config.get("scheme", DEFAULT_SCHEME)], dtype=np.int64
+    )
+
+
+def get_points(places: pd.Series, points_table: np.ndarray) -> pd.Series:
+    """
+    Assign points to places ('1.', '2.', ..., 'DISK', 'MS') by a points table.
+
+    Parameters
+    ----------
+    places
+        Places in a race.
+    points_table
+        Points for places 1, 2, 3, ... (see `load_points_table`).
+
+    Returns
+    -------
+    Points for every place (0 for 'DISK', 'MS' and places beyond the table).
+    """
+    place_numbers = (
+        pd.to_numeric(
+            places.where(~places.isin(NO_POINTS_PLACES)).str.rstrip("."),
+            errors="raise",
+        )
+        .fillna(0)
+        .to_numpy(dtype=np.int64)
+    )
+    # Index 0 of the padded table is a sentinel for places without points
+    padded_table = np.concatenate([[0], points_table])
+    indices = np.where(place_numbers > len(points_table), 0, place_numbers)
+    return pd.Series(padded_table[indices], index=places.index, dtype=np.int64)
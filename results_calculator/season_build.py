@@ -0,0 +1,312 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import requests
+import typer
+
+from results_calculator.cli import app
+from results_calculator.display import display_results
+from results_calculator.files import file_hash, write_if_changed
+from results_calculator.overall import CATEGORIES, overall
+from results_calculator.race import (
+    ORIS_RETRIES,
+    ZV_KID_YEAR,
+    ZV_VET_YEAR,
+    fetch_race,
+    get_season_race_ids,
+    index_known_unregs,
+    load_known_unregs,
+    score_race,
+)
+from results_calculator.runner_index import (
+    load_runner_index,
+    save_runner_index,
+    update_runner_index,
+)
+from results_calculator.scoring import load_points_table
+from src import oris
+
+
+@app.command("season-build")
+def season_build(
+    season: str,
+    known_unregs_file: Path = typer.Option(
+        Path("./data/known_unregs.json"),
+        "--known-unregs",
+        "-u",
+        help="File with list of known unregistered runners and their year of birth.",
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Run all stages even if their inputs didn't change.",
+    ),
+    interactive: bool = typer.Option(
+        True,
+        "--interactive/--non-interactive",
+        help="Ask about duplicate runners that can't be resolved automatically "
+        "(or fail the overall stage and list them).",
+    ),
+) -> None:
+    """
+    Build all results of a season: points of every BZL race, overall results,
+    display-ready results for the web and the index of runners' results
+    across seasons.
+
+    Results of all BZL races (with ORIS ID) of the season are fetched from ORIS
+    (raw responses are archived in 'data/<season>/raw').
+    Content hashes of inputs and outputs of every stage are stored in
+    'data/<season>/results/manifest.json'. A stage whose inputs didn't change
+    since the last build is skipped and unchanged files are not rewritten.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g. '24-25').
+    known_unregs_file
+        File with list of known unregistered runners and their year of birth.
+    force
+        Run all stages even if their inputs didn't change.
+    interactive
+        Ask about duplicate runners without a recorded decision. Otherwise the
+        overall stage fails and lists them.
+    """
+    results_dir = Path(f"data/{season}/results")
+    results_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = results_dir / "manifest.json"
+    manifest = _load_manifest(manifest_path)
+    known_unregs = load_known_unregs(known_unregs_file)
+    points_table = load_points_table(season)
+
+    # Inputs shared by all races (ZV split depends on the current year)
+    common_inputs = {
+        "known_unregs": _content_hash(known_unregs),
+        "points_table": _content_hash(points_table.tolist()),
+        "zv_kid_year": ZV_KID_YEAR,
+        "zv_vet_year": ZV_VET_YEAR,
+    }
+
+    # Stage 1: fetch and score races
+    unregs_registry = index_known_unregs(known_unregs)
+    session = oris.create_session(retries=ORIS_RETRIES)
+    oris_ids = get_season_race_ids(season)
+    with ThreadPoolExecutor(max_workers=oris.MAX_WORKERS) as executor:
+        built_races = list(
+            executor.map(
+                lambda oris_id: _build_race(
+                    oris_id,
+                    manifest["races"].get(str(oris_id)),
+                    common_inputs,
+                    unregs_registry,
+                    points_table,
+                    results_dir,
+                    session,
+                    force,
+                ),
+                oris_ids,
+            )
+        )
+    manifest["races"] = {
+        str(oris_id): entry
+        for oris_id, (entry, _) in zip(oris_ids, built_races)
+        if entry is not None
+    }
+
+    # Stage 2: overall results
+    overall_status = _build_overall(season, results_dir, manifest, force, interactive)
+
+    if write_if_changed(manifest_path, json.dumps(manifest, indent=2) + "\n"):
+        logging.info("Manifest exported to '%s'", manifest_path)
+
+    # Stage 3: display-ready results (an unchanged file isn't rewritten)
+    if overall_status != "failed":
+        try:
+            display_results(season)
+        except typer.Exit:
+            overall_status = "failed"
+
+    # Stage 4: index of runners' results across seasons (only new points files)
+    index = load_runner_index()
+    update_runner_index(index)
+    save_runner_index(index)
+
+    summary = [
+        {
+            "Stage": f"race {oris_id}",
+            "Name": entry["name"] if entry else None,
+            "Status": status,
+        }
+        for oris_id, (entry, status) in zip(oris_ids, built_races)
+    ]
+    summary.append({"Stage": "overall", "Name": None, "Status": overall_status})
+    typer.echo(pd.DataFrame(summary).to_markdown(index=False))
+    if any(row["Status"] == "failed" for row in summary):
+        raise typer.Exit(code=1)
+
+
+def _build_race(
+    oris_id: int,
+    previous: dict[str, Any] | None,
+    common_inputs: dict[str, Any],
+    known_unregs: pd.DataFrame,
+    points_table: np.ndarray,
+    results_dir: Path,
+    session: requests.Session,
+    force: bool,
+) -> tuple[dict[str, Any] | None, str]:
+    """
+    Fetch results of a race and write its points file if the inputs changed.
+
+    Parameters
+    ----------
+    oris_id
+        ORIS ID of the race.
+    previous
+        Manifest entry of the race from the previous build.
+    common_inputs
+        Inputs shared by all races (hashes of known unregs and points table,
+        age limits).
+    known_unregs
+        Registry of known unregistered runners (see `index_known_unregs`).
+    points_table
+        Points for places 1, 2, 3, ... of the season's scoring scheme.
+    results_dir
+        Directory with results of the season.
+    session
+        HTTP session (connection pool) used for requests to ORIS.
+    force
+        Score the race even if its inputs didn't change.
+
+    Returns
+    -------
+    Manifest entry of the race (the previous one if the race couldn't be
+    fetched) and status of the stage.
+    """
+    try:
+        race_metadata, results_data = fetch_race(
+            oris_id, session, results_dir.parent / "raw"
+        )
+    except (requests.RequestException, KeyError) as e:
+        logging.error("Fetching race %s from ORIS failed!\n%s", oris_id, e)
+        return previous, "failed"
+
+    entry: dict[str, Any] = {
+        "name": race_metadata.get("Name") if race_metadata else None,
+        "date": race_metadata.get("Date") if race_metadata else None,
+        "inputs": {"results": _content_hash(results_data), **common_inputs},
+        "outputs": {},
+    }
+    if not results_data:
+        logging.warning("Race %s has no results (yet).", oris_id)
+        return entry, "no results"
+
+    output_file = results_dir / f"points_{oris_id}.csv"
+    if (
+        not force
+        and previous is not None
+        and previous["inputs"] == entry["inputs"]
+        and _outputs_unchanged(results_dir, previous["outputs"])
+    ):
+        logging.info("Inputs of race %s are unchanged, skipping it.", oris_id)
+        return {**entry, "outputs": previous["outputs"]}, "skipped"
+
+    try:
+        df_results = score_race(results_data, known_unregs, points_table)
+    except (KeyError, ValueError) as e:
+        logging.error("Results of race %s have a wrong format!\n%s", oris_id, e)
+        return previous, "failed"
+
+    written = write_if_changed(output_file, df_results.to_csv(sep=",", index=False))
+    entry["outputs"] = {output_file.name: file_hash(output_file)}
+    return entry, "written" if written else "unchanged"
+
+
+def _build_overall(
+    season: str,
+    results_dir: Path,
+    manifest: dict[str, Any],
+    force: bool,
+    interactive: bool,
+) -> str:
+    """
+    Calculate overall results if any points file (or the journal of manual
+    decisions) changed since the last build.
+
+    The manifest entry of overall results is updated in place.
+
+    Returns
+    -------
+    Status of the stage.
+    """
+    inputs = _overall_inputs(results_dir)
+    previous = manifest.get("overall")
+    if (
+        not force
+        and previous is not None
+        and previous["inputs"] == inputs
+        and _outputs_unchanged(results_dir, previous["outputs"])
+    ):
+        logging.info("Points of season '%s' are unchanged, skipping overall.", season)
+        return "skipped"
+
+    try:
+        overall(season, incremental=True, interactive=interactive)
+    except typer.Exit:
+        return "failed"
+    # New manual decisions could have been recorded
+    inputs = _overall_inputs(results_dir)
+
+    outputs = {}
+    for class_desc in CATEGORIES:
+        output_file = results_dir / f"overall_{class_desc}.csv"
+        if output_file.exists():
+            outputs[output_file.name] = file_hash(output_file)
+    manifest["overall"] = {"inputs": inputs, "outputs": outputs}
+    if previous is not None and previous["outputs"] == outputs:
+        return "unchanged"
+    return "written"
+
+
+def _overall_inputs(results_dir: Path) -> dict[str, str]:
+    """Get hashes of inputs of overall results (points and decisions journal)."""
+    inputs = {f.name: file_hash(f) for f in sorted(results_dir.glob("points_*.csv"))}
+    decisions_file = results_dir / "decisions.json"
+    if decisions_file.exists():
+        inputs[decisions_file.name] = file_hash(decisions_file)
+    return inputs
+
+
+def _outputs_unchanged(results_dir: Path, outputs: dict[str, str]) -> bool:
+    """Check that output files exist and weren't changed since the last build."""
+    return all(
+        (results_dir / name).exists() and file_hash(results_dir / name) == digest
+        for name, digest in outputs.items()
+    )
+
+
+def _content_hash(data: Any) -> str:
+    """Get hash of JSON serializable data."""
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+def _load_manifest(path: Path) -> dict[str, Any]:
+    """Load manifest of the previous build (or create an empty one)."""
+    try:
+        with path.open(encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {"races": {}}
+    except json.JSONDecodeError as e:
+        logging.warning("Manifest '%s' is corrupted, ignoring it.\n%s", path, e)
+        return {"races": {}}
+    manifest.setdefault("races", {})
+    return manifest
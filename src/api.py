@@ -0,0 +1,241 @@
+"""Machine-readable (JSON) overall results and events of seasons."""
+
+import datetime
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+from flask import request
+from werkzeug import Response
+
+from results_calculator.overall import CATEGORIES
+from src.event import Event, build_oris_name_mapping
+
+# Upper bound of API responses kept in memory
+MAX_CACHED_RESPONSES = 256
+
+# Clients may reuse a response for this long without revalidation
+MAX_AGE = 60
+
+# Event attributes in the events API (in this order)
+EVENT_FIELDS = [
+    "name",
+    "date",
+    "oris_id",
+    "is_bzl",
+    "bzl_order",
+    "place_desc",
+    "difficulty",
+    "organizer",
+    "web",
+    "entry_date",
+    "gps_lat",
+    "gps_lon",
+    "desc_short",
+]
+
+
+class ApiCache:
+    """
+    In-process cache of JSON API responses.
+
+    Every response is identified by a key (e.g. endpoint and its arguments)
+    and by a version of the data it was built from. The JSON is serialized
+    and gzipped once per version. Its content hash is used as a strong ETag
+    (with a '-gzip' suffix for the compressed representation).
+
+    Attributes
+    ----------
+    _responses
+        Mapping of response key to a tuple of (version, ETag, JSON, gzipped
+        JSON).
+
+    """
+
+    def __init__(self, max_responses: int = MAX_CACHED_RESPONSES) -> None:
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_responses
+            Maximal number of responses kept in the cache.
+
+        """
+        self._responses: OrderedDict[tuple, tuple[str, str, bytes, bytes]] = (
+            OrderedDict()
+        )
+        self._max_responses = max_responses
+        self._lock = threading.Lock()
+
+    def respond(self, key: tuple, version: str, build: Callable[[], Any]) -> Response:
+        """
+        Respond with cached JSON, '304 Not Modified' or freshly built JSON.
+
+        Parameters
+        ----------
+        key
+            Identifier of the response.
+        version
+            Version of the data the response is built from.
+        build
+            Function building JSON serializable data (called only on a cache
+            miss).
+
+        Returns
+        -------
+        Response (gzipped if the client accepts it) with ETag and
+        Cache-Control headers.
+
+        """
+        etag, body, gzipped = self._get_response(key, version, build)
+        if "gzip" in request.accept_encodings:
+            etag, body = f"{etag}-gzip", gzipped
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype="application/json")
+            if body is gzipped:
+                response.content_encoding = "gzip"
+
+        response.set_etag(etag)
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.max_age = MAX_AGE
+        return response
+
+    def _get_response(
+        self, key: tuple, version: str, build: Callable[[], Any]
+    ) -> tuple[str, bytes, bytes]:
+        """Get response from the cache or build it and store it."""
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and cached[0] == version:
+                self._responses.move_to_end(key)
+                return cached[1:]
+
+        body = json.dumps(
+            build(), ensure_ascii=False, separators=(",", ":"), default=str
+        ).encode()
+        etag = hashlib.sha1(body).hexdigest()
+        gzipped = gzip.compress(body, mtime=0)
+
+        with self._lock:
+            self._responses[key] = (version, etag, body, gzipped)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self._max_responses:
+                self._responses.popitem(last=False)
+        return etag, body, gzipped
+
+
+def build_results_json(
+    season: str, events: dict[str, Event] | None, category: str | None = None
+) -> dict[str, Any]:
+    """
+    Build compact (columnar) overall results of a season.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g., '24-25').
+    events
+        All events of the season (used for naming races).
+    category, optional
+        Category of the results (all categories if not given).
+
+    Returns
+    -------
+    Season and results of every category. Results of a category contain
+    columns (lists) of places, names, RegNos and totals of the best N races
+    and places and points of every race.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the season has no overall results.
+
+    """
+    race_names = build_oris_name_mapping(events or {})
+    categories = CATEGORIES if category is None else [category]
+    return {
+        "season": season,
+        "categories": {
+            cat: _category_results_json(season, cat, race_names) for cat in categories
+        },
+    }
+
+
+def _category_results_json(
+    season: str, category: str, race_names: dict[int, str]
+) -> dict[str, Any]:
+    """Build compact (columnar) overall results of a category."""
+    df = pd.read_csv(
+        f"data/{season}/results/overall_{category}.csv", index_col=0, dtype=str
+    )
+    best_n_col = str(df.filter(regex=r"Best.*").columns[0])
+    oris_ids = [int(col.split("-")[0]) for col in df.columns if col.endswith("-Place")]
+    return {
+        "best_n": int(best_n_col.split("-", 1)[0][4:]),
+        "place": _int_column(df["place"]),
+        "name": df["Name"].tolist(),
+        "reg_no": df["RegNo"].tolist(),
+        "total": _int_column(df[best_n_col]),
+        "races": [
+            {
+                "oris_id": oris_id,
+                "name": race_names.get(oris_id),
+                "place": _nullable_column(df[f"{oris_id}-Place"]),
+                "points": _int_column(df[f"{oris_id}-Points"]),
+            }
+            for oris_id in oris_ids
+        ],
+    }
+
+
+def _int_column(column: pd.Series) -> list[int | None]:
+    """Convert a column of numbers (stored as strings) to a list of ints."""
+    return [int(float(x)) if isinstance(x, str) else None for x in column]
+
+
+def _nullable_column(column: pd.Series) -> list[str | None]:
+    """Convert a column to a list with None for missing values."""
+    return [x if isinstance(x, str) else None for x in column]
+
+
+def build_events_json(season: str, events: dict[str, Event] | None) -> dict[str, Any]:
+    """
+    Build compact (columnar) list of events of a season.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g., '24-25').
+    events
+        All events of the season (sorted by date).
+
+    Returns
+    -------
+    Season, event ids and a list of values of every event attribute (see
+    `EVENT_FIELDS`).
+
+    """
+    events = events or {}
+    columns: dict[str, list[Any]] = {"id": list(events)}
+    for field in EVENT_FIELDS:
+        columns[field] = [
+            _json_value(getattr(ev, field, None)) for ev in events.values()
+        ]
+    return {"season": season, "events": columns}
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a value of an event attribute to a JSON value."""
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
@@ -1,12 +1,12 @@
 import datetime
-import logging  # TODO: setup logger properly
-from collections import defaultdict
 from enum import StrEnum
 from typing import Any
-from urllib.error import HTTPError
 
 import requests
 
+from src import oris
+from src.oris_cache import OrisCache
+
 
 class Difficulty(StrEnum):
     """Enumeration of event difficulty levels."""
@@ -159,7 +159,9 @@ class Event:
         """
         return self.__dict__
 
-    def _fetch_oris_data(self, oris_id: int) -> dict[str, Any]:
+    def _fetch_oris_data(
+        self, oris_id: int, session: requests.Session | None = None
+    ) -> dict[str, Any]:
         """
         Get info about an event from ORIS API.
 
@@ -169,22 +171,20 @@ class Event:
         ----------
         oris_id
             Event's ORIS ID
+        session
+            HTTP session (connection pool) used for the request.
 
         Returns
         -------
         Dict
             Info about the event in ORIS.
+
+        Raises
+        ------
+        requests.RequestException
+            If the communication with ORIS fails.
         """
-        api_url = (
-            "https://oris.orientacnisporty.cz/API/?format=json&method=getEvent&"
-            f"id={oris_id}"
-        )
-        try:
-            response = requests.get(api_url)
-            oris_json = response.json()["Data"]
-        except (ConnectionError, HTTPError, TimeoutError) as e:
-            logging.error("Communication with ORIS (race %s) failed!\n%s", oris_id, e)
-            oris_json = defaultdict(None)
+        oris_json = oris.get_event(oris_id, session)
 
         result = {
             "name": oris_json["Name"],
@@ -198,18 +198,73 @@ class Event:
         result["is_past"] = datetime.date.today() > result["date"]
         return result
 
-    def add_oris_data(self) -> None:
+    def get_oris_data(
+        self,
+        session: requests.Session | None = None,
+        cache: OrisCache | None = None,
+    ) -> dict[str, Any]:
         """
-        Append information about an event retrieved from ORIS API.
+        Get information about an event from ORIS API (the event isn't changed).
 
-        If some info was manually set in config, it's NOT overwritten by ORIS.
+        Parameters
+        ----------
+        session
+            HTTP session (connection pool) used for the request.
+        cache
+            Cache of ORIS data. ORIS is requested only if the cache doesn't
+            contain up-to-date data of the event.
+
+        Returns
+        -------
+        Data in the format returned by `_fetch_oris_data`.
         """
         if not self.oris_id:
             raise AttributeError(
                 f"Event {self.name} does not have ORIS ID and tries to fetch ORIS data!"
             )
-        oris_data = self._fetch_oris_data(self.oris_id)
+        oris_data = cache.get(self.oris_id) if cache is not None else None
+        if oris_data is None:
+            oris_data = self._fetch_oris_data(self.oris_id, session)
+            if cache is not None:
+                cache.put(self.oris_id, oris_data)
+        return oris_data
 
+    def apply_oris_data(self, oris_data: dict[str, Any]) -> None:
+        """
+        Append information about an event retrieved from ORIS API before.
+
+        If some info was manually set in config, it's NOT overwritten by ORIS.
+
+        Parameters
+        ----------
+        oris_data
+            Data in the format returned by `_fetch_oris_data`.
+        """
         for key, oris_value in oris_data.items():
             if getattr(self, key) is None:
                 setattr(self, key, oris_value)
+
+
+def build_oris_name_mapping(events: dict) -> dict:
+    """
+    Build mapping from ORIS IDs to event names.
+
+    Parameters
+    ----------
+    events
+        Dictionary of event objects.
+
+    Returns
+    -------
+    Dictionary mapping ORIS IDs to event names.
+
+    """
+    oris_id_to_name_mapping = {}
+    for ev in events.values():
+        if ev.oris_id and ev.name is not None:
+            if "BZL" in ev.name:
+                name = ev.name.split("BZL: ")[1]
+            else:
+                name = ev.name
+            oris_id_to_name_mapping[ev.oris_id] = name
+    return oris_id_to_name_mapping
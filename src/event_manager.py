@@ -1,31 +1,198 @@
+import copy
+import hashlib
 import json
 import logging  # TODO: setup logger properly
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
 from typing import Any, overload
-from urllib.error import HTTPError
 
+import requests
+
+from src import oris, snapshot
 from src.event import Event
+from src.oris_cache import OrisCache
+from src.snapshot import EventSnapshot
+
+# Data not refreshed from ORIS for this long are reported as stale
+STALE_AFTER = timedelta(minutes=30)
 
 
 class EventManager:
     """
     Manages loading and accessing orienteering events across multiple seasons.
 
+    Loaded events are kept in a snapshot which is replaced as a whole by every
+    update, so readers never see partially updated data.
+
+    When more processes (e.g. gunicorn workers) use the same data, only one of
+    them (the leader) refreshes the data and publishes the snapshot. Other
+    processes just load the published snapshot when it changes.
+
     Attributes
     ----------
-    _events
-        Dictionary mapping season identifiers to their events.
+    _snapshot
+        Currently loaded events, their version and time of the last change.
+    _snapshot_mtime
+        Modification time of the published snapshot loaded by a non-leader.
+    _config_signatures
+        Modification time and size of config files of loaded events (per season).
+    _oris_missing
+        Events (season, event_id) whose ORIS data couldn't be fetched.
 
     """
 
     def __init__(self) -> None:
-        """Initialize the EventManager and load all events from all seasons."""
-        seasons = self.get_all_seasons()
-        self._events = {season: self._load_all_events(season) for season in seasons}
+        """
+        Initialize the EventManager and load all events from all seasons.
+
+        ORIS isn't requested here. Only the published snapshot (or configs and
+        cached ORIS data) are loaded and `update` must be called to refresh
+        the data.
+        """
+        self._session = oris.create_session()
+        self._oris_cache = OrisCache()
+        self._snapshot = EventSnapshot({}, "", datetime.now(UTC))
+        self._snapshot_mtime: int | None = None
+        self._config_signatures: dict[str, dict[str, tuple[int, int]]] = {}
+        self._oris_missing: set[tuple[str, str]] = set()
+        self._leader_lock = snapshot.LeaderLock()
+        self._update_lock = threading.Lock()
+
+        if not self._load_published():
+            self._refresh(fetch=False)
+
+    @property
+    def version(self) -> str:
+        """Hash of the loaded event data. It changes whenever the data change."""
+        return self._snapshot.version
+
+    @property
+    def updated_at(self) -> datetime:
+        """Time (UTC) of the last change of the loaded event data."""
+        return self._snapshot.updated_at
+
+    def is_stale(self) -> bool:
+        """
+        Check whether the loaded data may be outdated.
+
+        Data are stale if they weren't refreshed from ORIS recently (e.g. right
+        after start or when the refreshing process is stuck) or if ORIS data
+        of some events couldn't be fetched.
+        """
+        current = self._snapshot
+        return (
+            current.refreshed_at is None
+            or datetime.now(UTC) - current.refreshed_at > STALE_AFTER
+            or current.oris_missing > 0
+        )
+
+    def get_status(self) -> dict[str, Any]:
+        """
+        Get status of the loaded data (e.g. for health checks).
 
-    def _load_all_events(self, season: str):
+        Returns
+        -------
+        Dict
+            Version of the data, times of the last change and refresh, number
+            of events without up-to-date ORIS data and whether data are stale.
+        """
+        current = self._snapshot
+        return {
+            "version": current.version,
+            "updated_at": current.updated_at.isoformat(),
+            "refreshed_at": (
+                current.refreshed_at.isoformat() if current.refreshed_at else None
+            ),
+            "oris_missing": current.oris_missing,
+            "stale": self.is_stale(),
+        }
+
+    def _load_all_seasons(self, fetch: bool = True) -> dict[str, dict[str, Event]]:
         """
-        Create a dict with all events of a season.
+        Create a dict with all events of all seasons.
+
+        Only events whose config changed or whose ORIS data are due for refresh
+        are created again, other events are reused. Seasons without such
+        events (typically past seasons) are reused as a whole.
+
+        Data of all (re)created events with an ORIS ID are taken from the ORIS
+        cache or fetched from ORIS concurrently.
+
+        Parameters
+        ----------
+        fetch
+            Whether to fetch data missing in the ORIS cache from ORIS. If False,
+            outdated cached data are used and the events are refreshed later.
+
+        Returns
+        -------
+        Dict
+            Season identifiers as keys, events of the season (sorted by event date)
+            as values.
+        """
+        previous = self._snapshot.events
+        signatures = {
+            season: self._get_config_signatures(season)
+            for season in self.get_all_seasons()
+        }
+
+        events = {}
+        changed_seasons = []
+        to_fetch = []
+        for season, season_signatures in signatures.items():
+            old_events = previous.get(season, {})
+            old_signatures = self._config_signatures.get(season, {})
+            if (
+                season in previous
+                and season_signatures == old_signatures
+                and not any(
+                    self._is_refresh_due(season, e_id, e)
+                    for e_id, e in old_events.items()
+                )
+            ):
+                events[season] = old_events
+                continue
+
+            season_events = {}
+            for event_id, signature in season_signatures.items():
+                old_event = old_events.get(event_id)
+                if (
+                    old_event is not None
+                    and signature == old_signatures.get(event_id)
+                    and not self._is_refresh_due(season, event_id, old_event)
+                ):
+                    # Copy, as the order in BZL series may change
+                    season_events[event_id] = copy.copy(old_event)
+                    continue
+                event = self._create_event_from_config(season, event_id)
+                if event:
+                    season_events[event_id] = event
+                    if event.oris_id:
+                        to_fetch.append((season, event_id, event))
+            events[season] = season_events
+            changed_seasons.append(season)
+
+        if to_fetch:
+            # Other processes may have refreshed the cache in the meantime
+            self._oris_cache.load()
+            self._oris_missing = self._add_oris_data(to_fetch, fetch) | {
+                key
+                for key in self._oris_missing
+                if key[0] not in changed_seasons and key[0] in events
+            }
+            self._oris_cache.save()
+        self._config_signatures = signatures
+
+        for season in changed_seasons:
+            events[season] = self._assign_bzl_order(self._sort_by_date(events[season]))
+        return events
+
+    @staticmethod
+    def _get_config_signatures(season: str) -> dict[str, tuple[int, int]]:
+        """
+        Get modification time and size of config files of all events of a season.
 
         Parameters
         ----------
@@ -35,38 +202,250 @@ class EventManager:
         Returns
         -------
         Dict
-            All events in a season. 'event_id' (NOT oris_id) as keys, events as values.
-            Sorted by event date.
+            'event_id' as keys, (modification time in ns, size) as values.
         """
-        season_dir = Path(f"data/{season}/events/")
-        events = {}
+        signatures = {}
+        for event_file in Path(f"data/{season}/events/").glob("*.json"):
+            stat = event_file.stat()
+            signatures[event_file.stem] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
 
-        for event_file in season_dir.glob("*.json"):
-            event = self._create_event_from_config(season, event_file.stem)
-            if event:
-                events[event_file.stem] = event
+    def _is_refresh_due(self, season: str, event_id: str, event: Event) -> bool:
+        """
+        Check whether ORIS data of an event should be refreshed.
+
+        Data of upcoming events may change, data of past events are final
+        (unless they couldn't be fetched).
+        """
+        if not event.oris_id:
+            return False
+        return not event.is_past or (season, event_id) in self._oris_missing
+
+    @staticmethod
+    def _sort_by_date(events: dict[str, Event]) -> dict[str, Event]:
+        """Sort events by date (events without a date go last)."""
 
-        # Sort by date
         def _event_date(event_tuple):
             # Helper function for sorting by date - class version
-            return event_tuple[1].date
+            return event_tuple[1].date or date.max
 
-        events = dict(sorted(events.items(), key=_event_date))
-        events = self._assign_bzl_order(events)
-        return events
+        return dict(sorted(events.items(), key=_event_date))
+
+    def _add_oris_data(
+        self, events: list[tuple[str, str, Event]], fetch: bool = True
+    ) -> set[tuple[str, str]]:
+        """
+        Fetch data of events from ORIS concurrently.
+
+        Requests share one connection pool, their number in flight is bounded
+        by `oris.MAX_WORKERS` and all of them must finish within
+        `oris.TOTAL_TIMEOUT` seconds. Events whose data couldn't be fetched
+        get outdated data from the ORIS cache (if there are any).
+
+        Parameters
+        ----------
+        events
+            Events (with ORIS ID) with their season and identifier.
+        fetch
+            Whether to fetch data missing in the ORIS cache from ORIS.
+
+        Returns
+        -------
+        Set
+            Events (season, event_id) without up-to-date data.
+        """
+        if not fetch:
+            return {
+                (season, event_id)
+                for season, event_id, event in events
+                if not self._add_cached_oris_data(event)
+            }
+
+        # Workers only fetch the data, they are added to events here, so
+        # workers still running after the timeout can't change the events
+        executor = ThreadPoolExecutor(max_workers=oris.MAX_WORKERS)
+        futures = {
+            executor.submit(event.get_oris_data, self._session, self._oris_cache): (
+                season,
+                event_id,
+                event,
+            )
+            for season, event_id, event in events
+        }
+        _, not_done = wait(futures, timeout=oris.TOTAL_TIMEOUT)
+        executor.shutdown(wait=False, cancel_futures=True)
+        missing = set()
+        for future, (season, event_id, event) in futures.items():
+            if future in not_done:
+                logging.error(
+                    "Fetching ORIS data of event '%s' didn't finish in time!", event_id
+                )
+                self._add_outdated_oris_data(event)
+                missing.add((season, event_id))
+            elif not self._add_fetched_oris_data(event_id, event, future):
+                missing.add((season, event_id))
+        return missing
+
+    def _add_fetched_oris_data(
+        self, event_id: str, event: Event, future: Future[dict[str, Any]]
+    ) -> bool:
+        """
+        Add data of a single event fetched from ORIS to the event.
+
+        If the data couldn't be fetched, outdated data from the ORIS cache are
+        added instead (if there are any).
+
+        Parameters
+        ----------
+        event_id
+            Event identifier in the season (e.g. 'nopb').
+        event
+            Event with ORIS ID.
+        future
+            Finished fetching of the event's data (see `Event.get_oris_data`).
+
+        Returns
+        -------
+        Whether up-to-date data were added.
+        """
+        try:
+            oris_data = future.result()
+        except requests.RequestException as e:
+            logging.error("Communication with ORIS (event %s) failed!\n%s", event_id, e)
+            self._add_outdated_oris_data(event)
+            return False
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error("Unexpected ORIS data of event %s!\n%s", event_id, e)
+            return False
+        event.apply_oris_data(oris_data)
+        self._add_default_web(event)
+        return True
+
+    def _add_cached_oris_data(self, event: Event) -> bool:
+        """
+        Add data of a single event from the ORIS cache to the event.
+
+        Outdated data are added if there are no up-to-date data.
+
+        Returns
+        -------
+        Whether up-to-date data were added.
+        """
+        if event.oris_id is None:
+            return False
+        oris_data = self._oris_cache.get(event.oris_id)
+        if oris_data is None:
+            self._add_outdated_oris_data(event)
+            return False
+        event.apply_oris_data(oris_data)
+        self._add_default_web(event)
+        return True
+
+    def _add_outdated_oris_data(self, event: Event) -> None:
+        """Add outdated data from the ORIS cache to an event (if there are any)."""
+        if event.oris_id is None:
+            return
+        oris_data = self._oris_cache.get(event.oris_id, allow_expired=True)
+        if oris_data is not None:
+            event.apply_oris_data(oris_data)
+            self._add_default_web(event)
+
+    @staticmethod
+    def _add_default_web(event: Event) -> None:
+        """Use event's page in ORIS as its website if it has no other."""
+        if not event.web:
+            event.web = f"https://oris.orientacnisporty.cz/Zavod?id={event.oris_id}"
 
     def update(self) -> None:
         """
         Update EventManager.
 
-        Check for changes in 'data' folder + fetch data from ORIS API.
+        Check for changes in 'data' folder + fetch data from ORIS API (only for
+        upcoming events without up-to-date data in the ORIS cache). The new
+        snapshot of events is published at once.
+
+        Only the leader process refreshes the data, other processes load
+        the snapshot published by the leader.
+        """
+        with self._update_lock:
+            if self._leader_lock.acquire():
+                self._refresh()
+            else:
+                self._load_published()
+
+    def sync(self) -> None:
         """
-        seasons = self.get_all_seasons()
-        self._events = {season: self._load_all_events(season) for season in seasons}
+        Load the snapshot published by the leader if it changed.
+
+        If the leader process exited, this process takes over its role.
+        """
+        with self._update_lock:
+            if self._leader_lock.acquire():
+                return
+            self._load_published()
+
+    def _refresh(self, fetch: bool = True) -> None:
+        """
+        Refresh the data and publish them to other processes (if leader).
+
+        Parameters
+        ----------
+        fetch
+            Whether to fetch data missing in the ORIS cache from ORIS.
+        """
+        events = self._load_all_seasons(fetch)
+        version = self._compute_version(events)
+        now = datetime.now(UTC)
+        self._snapshot = EventSnapshot(
+            events,
+            version,
+            self._snapshot.updated_at if version == self._snapshot.version else now,
+            now if fetch else self._snapshot.refreshed_at,
+            len(self._oris_missing),
+        )
+        if self._leader_lock.acquire():
+            snapshot.publish(self._snapshot)
+
+    def _load_published(self) -> bool:
+        """
+        Load the snapshot published by the leader if it changed.
+
+        Returns
+        -------
+        Whether any published snapshot is loaded.
+        """
+        loaded = snapshot.load(loaded_mtime=self._snapshot_mtime)
+        if loaded is not None:
+            self._snapshot, self._snapshot_mtime = loaded
+        return self._snapshot_mtime is not None
+
+    @staticmethod
+    def _compute_version(events: dict[str, dict[str, Event]]) -> str:
+        """
+        Compute version of the event data.
+
+        Parameters
+        ----------
+        events
+            Events of all seasons.
+
+        Returns
+        -------
+        Short hash of all event attributes.
+        """
+        serialized = json.dumps(
+            {
+                season: {e_id: e.to_dict() for e_id, e in season_events.items()}
+                for season, season_events in events.items()
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(serialized.encode()).hexdigest()[:16]
 
     def _create_event_from_config(self, season: str, event_id: str) -> Event | None:
         """
-        Load event config, fetch ORIS data if available, and create Event instance.
+        Load event config and create Event instance (without data from ORIS).
 
         Parameters
         ----------
@@ -97,19 +476,7 @@ class EventManager:
             logging.error("Event initialization failed!\nConfig: %s\n%s", config, e)
             return None
 
-        # Add information from ORIS
-        if event.oris_id:
-            try:
-                event.add_oris_data()
-            except AttributeError as e:
-                logging.error("Event should have oris_id, but hasn't!\n%s", e)
-                return event
-            except HTTPError as e:  # TODO: specify errors better
-                logging.error("Communication with ORIS failed!\n%s", e)
-                return event
-            if not event.web:
-                event.web = f"https://oris.orientacnisporty.cz/Zavod?id={event.oris_id}"
-        elif not event.name or not event.date:
+        if not event.oris_id and (not event.name or not event.date):
             logging.error(
                 "Each event must have either 'oris_id' or both 'name' and "
                 "'date'. Event %s has neither.",
@@ -136,7 +503,7 @@ class EventManager:
         Optional[Event]
             _description_
         """
-        events = self._events.get(season, None)
+        events = self._snapshot.events.get(season, None)
         if events:
             event = events.get(event_id, None)
             return event
@@ -169,12 +536,11 @@ class EventManager:
             All events in a season. 'event_id' (NOT oris_id) as keys, events as values.
             Sorted by event date.
         """
-        events = self._events.get(season, None)
+        events = self._snapshot.events.get(season, None)
 
-        if events:
+        if events and as_dicts:
             # Convert classes to dicts
-            if as_dicts:
-                events = {e_id: e.to_dict() for e_id, e in events.items()}
+            return {e_id: e.to_dict() for e_id, e in events.items()}
 
         return events
 
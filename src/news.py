@@ -1,8 +1,15 @@
+import hashlib
+import os
 import re
-from datetime import date
+import threading
+from datetime import UTC, date, datetime
 from pathlib import Path
 
-from flask import render_template_string
+from flask import current_app, render_template
+from jinja2 import Template
+
+# Directory with news items (one HTML file per item)
+NEWS_DIR = Path("templates/news")
 
 
 class NewsItem:
@@ -17,6 +24,10 @@ class NewsItem:
         The date when the news item was created, parsed from the filename.
     title
         The title extracted from the h2 tag in the content.
+    _template
+        The content compiled as a Jinja template (on the first rendering).
+    _rendered
+        The rendered content without the h2 title tag (on the first rendering).
 
     """
 
@@ -43,39 +54,119 @@ class NewsItem:
         h2_match = re.search(r"<h2[^>]*>(.*?)</h2>", content)
         self.title = h2_match.group(1) if h2_match else None
 
+        self._template: Template | None = None
+        self._rendered: str | None = None
+
     def get_rendered_content(self) -> str:
         """
         Render the content and remove the h2 title tag.
 
+        The content is compiled and rendered only once, the item is reloaded
+        (see `NewsRepository`) when its file changes.
+
         Returns
         -------
         The rendered HTML content without the h2 title tag.
 
         """
+        if self._rendered is not None:
+            return self._rendered
         # Render the content when needed, processing any template tags
-        rendered = render_template_string(self.raw_content)
+        if self._template is None:
+            self._template = current_app.jinja_env.from_string(self.raw_content)
+        rendered = render_template(self._template)
         # Remove the h2 title from the rendered content
         h2_match = re.search(r"<h2[^>]*>(.*?)</h2>", rendered)
         if h2_match:
             rendered = rendered.replace(h2_match.group(0), "")
+        self._rendered = rendered
         return rendered
 
 
-def load_news() -> list[NewsItem]:
+class NewsRepository:
     """
-    Load all news items from the templates/news directory.
+    In-process cache of news items.
 
-    Returns
-    -------
-    List of NewsItem objects sorted by date in descending order.
+    The news directory is listed on every access, but only files that are new
+    or whose modification time (or size) changed are read and parsed again.
+    Items of unchanged files keep their compiled and rendered content.
+
+    Attributes
+    ----------
+    news_dir
+        Directory with news items.
+    version
+        Short hash of names, sizes and modification times of the loaded files.
+    modified_at
+        Time of the most recent modification of the loaded files.
+    _files
+        File name mapped to its signature (modification time in ns and size)
+        and the parsed item.
+    _items
+        Loaded items sorted by date in descending order.
 
     """
-    news_dir = Path("templates/news")
-    news_items = []
 
-    for file in sorted(news_dir.glob("*.html"), reverse=True):
-        with file.open(encoding="utf-8") as f:
-            content = f.read()
-            news_items.append(NewsItem(content, file.name))
+    def __init__(self, news_dir: Path = NEWS_DIR) -> None:
+        """
+        Initialize an empty repository (items are loaded on the first access).
 
-    return news_items
+        Parameters
+        ----------
+        news_dir
+            Directory with news items.
+
+        """
+        self.news_dir = news_dir
+        self.version = ""
+        self.modified_at = datetime.fromtimestamp(0, tz=UTC)
+        self._files: dict[str, tuple[tuple[int, int], NewsItem]] = {}
+        self._items: list[NewsItem] = []
+        self._signature: dict[str, tuple[int, int]] | None = None
+        self._lock = threading.Lock()
+
+    def get_items(self) -> list[NewsItem]:
+        """
+        Get all news items, reloading only changed files.
+
+        Returns
+        -------
+        List of NewsItem objects sorted by date in descending order.
+
+        """
+        signature = self._scan()
+        if signature == self._signature:
+            return self._items
+        with self._lock:
+            if signature == self._signature:
+                return self._items
+            files = {}
+            for name, file_signature in signature.items():
+                cached = self._files.get(name)
+                if cached is not None and cached[0] == file_signature:
+                    files[name] = cached
+                    continue
+                with (self.news_dir / name).open(encoding="utf-8") as f:
+                    files[name] = (file_signature, NewsItem(f.read(), name))
+            self._files = files
+            self._items = [files[name][1] for name in sorted(files, reverse=True)]
+            self.version = hashlib.sha1(
+                repr(sorted(signature.items())).encode()
+            ).hexdigest()[:16]
+            latest_mtime_ns = max((mtime for mtime, _ in signature.values()), default=0)
+            self.modified_at = datetime.fromtimestamp(latest_mtime_ns / 1e9, tz=UTC)
+            self._signature = signature
+            return self._items
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """Get modification time (ns) and size of every news file."""
+        signature: dict[str, tuple[int, int]] = {}
+        try:
+            entries = list(os.scandir(self.news_dir))
+        except FileNotFoundError:
+            return signature
+        for entry in entries:
+            if entry.name.endswith(".html") and entry.is_file():
+                stat = entry.stat()
+                signature[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return signature
@@ -0,0 +1,137 @@
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+ORIS_API_URL = "https://oris.orientacnisporty.cz/API/"
+
+# Maximal number of concurrent requests to ORIS
+MAX_WORKERS = 8
+
+# Timeout (seconds) of a single request to ORIS (connect, read)
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Deadline (seconds) for fetching data of all events
+TOTAL_TIMEOUT = 30
+
+# Base of exponential backoff (seconds) between retries of failed requests
+RETRY_BACKOFF = 0.5
+
+
+def create_session(pool_size: int = MAX_WORKERS, retries: int = 0) -> requests.Session:
+    """
+    Create an HTTP session for communication with ORIS.
+
+    Connections are kept alive and reused by all requests (and threads)
+    using the session.
+
+    Parameters
+    ----------
+    pool_size
+        Maximal number of connections kept in the pool.
+    retries
+        Number of retries of failed requests (connection errors, 429 and 5xx
+        responses) with exponential backoff.
+
+    Returns
+    -------
+    Session with a connection pool for ORIS.
+
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_response(
+    method: str, session: requests.Session | None = None, **params: Any
+) -> dict[str, Any]:
+    """
+    Call a method of ORIS API and get the whole (raw) response.
+
+    Parameters
+    ----------
+    method
+        ORIS API method (e.g. 'getEvent').
+    session
+        Session used for the request (a new connection is made if not given).
+    params
+        Parameters of the method (e.g. id=1234).
+
+    Returns
+    -------
+    Decoded JSON response (status, method, data etc.).
+
+    Raises
+    ------
+    requests.RequestException
+        If the communication with ORIS fails (incl. timeout).
+
+    """
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    url = f"{ORIS_API_URL}?format=json&method={method}&{query}"
+    response = (session or requests).get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_event(oris_id: int, session: requests.Session | None = None) -> dict[str, Any]:
+    """
+    Get info about an event from ORIS API ('getEvent' method).
+
+    Parameters
+    ----------
+    oris_id
+        Event's ORIS ID.
+    session
+        Session used for the request (a new connection is made if not given).
+
+    Returns
+    -------
+    Data of the event in ORIS.
+
+    Raises
+    ------
+    requests.RequestException
+        If the communication with ORIS fails (incl. timeout).
+    KeyError
+        If the response doesn't contain event data.
+
+    """
+    return get_response("getEvent", session, id=oris_id)["Data"]
+
+
+def get_event_results(
+    oris_id: int, session: requests.Session | None = None
+) -> dict[str, Any]:
+    """
+    Get results of an event from ORIS API ('getEventResults' method).
+
+    Parameters
+    ----------
+    oris_id
+        Event's ORIS ID.
+    session
+        Session used for the request (a new connection is made if not given).
+
+    Returns
+    -------
+    Results of the event in ORIS (result ID as keys, result as values).
+
+    Raises
+    ------
+    requests.RequestException
+        If the communication with ORIS fails (incl. timeout).
+    KeyError
+        If the response doesn't contain results.
+
+    """
+    return get_response("getEventResults", session, eventid=oris_id)["Data"]
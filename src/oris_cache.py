@@ -0,0 +1,135 @@
+import datetime
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+# Directory for persistent caches (can be changed by BZL_CACHE_DIR env. variable)
+CACHE_DIR = Path(os.environ.get("BZL_CACHE_DIR", "data/cache"))
+
+# How long are ORIS data of upcoming events considered up to date
+FUTURE_EVENT_TTL = datetime.timedelta(minutes=10)
+
+
+class OrisCache:
+    """
+    Persistent cache of event data fetched from ORIS.
+
+    Data of past events never expire (they won't change anymore), data of
+    upcoming events expire after `FUTURE_EVENT_TTL`. The cache is stored in
+    a JSON file, so it survives restarts and is shared by all workers.
+
+    Attributes
+    ----------
+    path
+        Path to the JSON file with cached data.
+    _entries
+        ORIS ID (as string) mapped to the time of fetching and the event data.
+    _modified
+        Whether there are entries not stored to disk yet.
+
+    """
+
+    def __init__(self, path: Path = CACHE_DIR / "oris_events.json") -> None:
+        """
+        Initialize the cache and load its content from disk.
+
+        Parameters
+        ----------
+        path
+            Path to the JSON file with cached data.
+
+        """
+        self.path = path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._modified = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load cached data from disk (e.g. refreshed by another process)."""
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            entries = {}
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(
+                "ORIS cache '%s' can't be read, ignoring it.\n%s", self.path, e
+            )
+            entries = {}
+        with self._lock:
+            self._entries = entries
+            self._modified = False
+
+    def save(self) -> None:
+        """Store cached data to disk (atomically) if there are new entries."""
+        with self._lock:
+            if not self._modified:
+                return
+            self._modified = False
+            content = json.dumps(self._entries, ensure_ascii=False, indent=1)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error("ORIS cache '%s' can't be written!\n%s", self.path, e)
+
+    def get(self, oris_id: int, allow_expired: bool = False) -> dict[str, Any] | None:
+        """
+        Get cached data of an event.
+
+        Parameters
+        ----------
+        oris_id
+            Event's ORIS ID.
+        allow_expired
+            Return also expired data (e.g. when ORIS is unreachable).
+
+        Returns
+        -------
+        Event data (in the same format as `Event._fetch_oris_data` returns)
+        or None if there are no (up-to-date) data.
+
+        """
+        with self._lock:
+            entry = self._entries.get(str(oris_id))
+        if entry is None:
+            return None
+
+        data = dict(entry["data"])
+        data["date"] = datetime.date.fromisoformat(data["date"])
+        data["is_past"] = datetime.date.today() > data["date"]
+        fetched_at = datetime.datetime.fromisoformat(entry["fetched_at"])
+        fetched_after_event = fetched_at.date() > data["date"]
+        if (
+            allow_expired
+            or fetched_after_event
+            or datetime.datetime.now() - fetched_at < FUTURE_EVENT_TTL
+        ):
+            return data
+        return None
+
+    def put(self, oris_id: int, data: dict[str, Any]) -> None:
+        """
+        Store data of an event in the cache (call `save` to persist them).
+
+        Parameters
+        ----------
+        oris_id
+            Event's ORIS ID.
+        data
+            Event data returned by `Event._fetch_oris_data`.
+
+        """
+        entry = {
+            "fetched_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "data": {**data, "date": data["date"].isoformat()},
+        }
+        with self._lock:
+            self._entries[str(oris_id)] = entry
+            self._modified = True
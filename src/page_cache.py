@@ -0,0 +1,172 @@
+"""Cache of rendered HTML pages with support for conditional requests."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+
+from flask import request
+from werkzeug import Response
+from werkzeug.http import is_resource_modified
+
+# Upper bound of pages kept in memory
+MAX_CACHED_PAGES = 256
+
+# Browsers and proxies may reuse a page for this long without revalidation
+MAX_AGE = 60
+
+# Streamed pages are sent in chunks of (at least) this many bytes
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def templates_version(templates_dir: Path = Path("templates")) -> tuple[str, datetime]:
+    """
+    Get version and modification time of all templates.
+
+    Rendered pages depend on templates as well as on data, so a deploy with
+    changed templates must invalidate pages cached by clients.
+
+    Parameters
+    ----------
+    templates_dir
+        Directory with Jinja templates.
+
+    Returns
+    -------
+    Short hash of templates' names, sizes and modification times and the time
+    of the most recent modification.
+
+    """
+    stats = sorted(
+        (str(f.relative_to(templates_dir)), f.stat().st_size, f.stat().st_mtime_ns)
+        for f in templates_dir.rglob("*.html")
+    )
+    version = hashlib.sha1(repr(stats).encode()).hexdigest()[:16]
+    latest_mtime_ns = max((mtime for _, _, mtime in stats), default=0)
+    return version, datetime.fromtimestamp(latest_mtime_ns / 1e9, tz=UTC)
+
+
+class PageCache:
+    """
+    In-process cache of rendered pages.
+
+    Every page is identified by a key (e.g. endpoint and its arguments) and by
+    a version of the data it was rendered from. The version is used as an
+    ETag, so conditional requests are answered with '304 Not Modified'
+    without rendering the page and repeated requests are served from memory.
+    Pages rendered as a stream of strings are sent to the client while they
+    are being rendered and stored once they are complete.
+
+    Attributes
+    ----------
+    _pages
+        Mapping of page key to a tuple of (ETag, rendered page).
+
+    """
+
+    def __init__(self, max_pages: int = MAX_CACHED_PAGES) -> None:
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_pages
+            Maximal number of pages kept in the cache.
+
+        """
+        self._pages: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+        self._max_pages = max_pages
+        self._lock = threading.Lock()
+        self._templates_version, self._templates_modified = templates_version()
+
+    def respond(
+        self,
+        key: tuple,
+        version: str,
+        last_modified: datetime,
+        render: Callable[[], str | Iterable[str]],
+    ) -> Response:
+        """
+        Respond with a cached page, '304 Not Modified' or a freshly rendered page.
+
+        Parameters
+        ----------
+        key
+            Identifier of the page.
+        version
+            Version of the data the page is rendered from.
+        last_modified
+            Time of the last modification of the data.
+        render
+            Function rendering the page or a stream of its parts (called only
+            on a cache miss).
+
+        Returns
+        -------
+        Response with ETag, Last-Modified and Cache-Control headers.
+
+        """
+        etag = hashlib.sha1(
+            repr((key, version, self._templates_version)).encode()
+        ).hexdigest()
+        last_modified = max(last_modified, self._templates_modified)
+
+        if not is_resource_modified(
+            request.environ, etag=etag, last_modified=last_modified
+        ):
+            response = Response(status=304)
+        else:
+            response = Response(self._get_page(key, etag, render), mimetype="text/html")
+
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = MAX_AGE
+        return response
+
+    def _get_page(
+        self, key: tuple, etag: str, render: Callable[[], str | Iterable[str]]
+    ) -> bytes | Iterator[bytes]:
+        """Get page from the cache or render it (or start streaming it)."""
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == etag:
+                self._pages.move_to_end(key)
+                return cached[1]
+
+        rendered = render()
+        if not isinstance(rendered, str):
+            return self._stream_page(key, etag, rendered)
+        page = rendered.encode()
+        self._store_page(key, etag, page)
+        return page
+
+    def _stream_page(
+        self, key: tuple, etag: str, parts: Iterable[str]
+    ) -> Iterator[bytes]:
+        """Send parts of a page in chunks and store the page once it's complete."""
+        chunks = []
+        buffer: list[bytes] = []
+        buffered = 0
+        for part in parts:
+            data = part.encode()
+            buffer.append(data)
+            buffered += len(data)
+            if buffered >= STREAM_CHUNK_SIZE:
+                chunks.append(b"".join(buffer))
+                buffer, buffered = [], 0
+                yield chunks[-1]
+        if buffer:
+            chunks.append(b"".join(buffer))
+            yield chunks[-1]
+        self._store_page(key, etag, b"".join(chunks))
+
+    def _store_page(self, key: tuple, etag: str, page: bytes) -> None:
+        """Store a rendered page (the least recently used pages are evicted)."""
+        with self._lock:
+            self._pages[key] = (etag, page)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self._max_pages:
+                self._pages.popitem(last=False)
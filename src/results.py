@@ -0,0 +1,357 @@
+"""Display-ready overall results of a season prepared for the results page."""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import unidecode as udc
+from markupsafe import escape
+
+from results_calculator.display import DISPLAY_RESULTS_FILE
+from results_calculator.overall import CATEGORIES, MEDALS_BY_GENDER_CATEGORIES
+from src.event import Event, build_oris_name_mapping
+
+# Row classes of medals in categories with medals by gender and in the others
+MEDAL_CLASSES = {
+    "gold": "medal-gold",
+    "silver": "medal-silver",
+    "bronze": "medal-bronze",
+}
+PLACE_CLASSES = {
+    "gold": "table-warning",
+    "silver": "table-light",
+    "bronze": "table-danger",
+}
+
+MEDAL_EMOJIS = {"gold": "🥇 ", "silver": "🥈 ", "bronze": "🥉 "}
+
+
+class ResultsRow(NamedTuple):
+    """Row of a results table with preformatted cells."""
+
+    css_class: str
+    place: str
+    cells: tuple[str, ...]
+
+
+class ResultsTable(NamedTuple):
+    """
+    Results table of a category ready for rendering.
+
+    Besides the rows it holds folded text of every row (for filtering) and
+    sort keys of every column (the place column first) for server-side paging.
+    """
+
+    columns: tuple[str, ...]
+    rows: tuple[ResultsRow, ...]
+    search_texts: tuple[str, ...]
+    sort_keys: tuple[tuple[tuple, ...], ...]
+
+
+SeasonResults = dict[str, ResultsTable]
+
+# Upper bound of seasons kept in memory (requests for unknown seasons are cached too)
+MAX_CACHED_SEASONS = 32
+
+
+class ResultsCache:
+    """
+    In-process cache of processed overall results.
+
+    Entries are stored per season and keyed by the signature of the season's
+    results files (see `results_signature`) and by version of the events
+    (races are named after them). Whenever either changes, the results are
+    loaded again on the next request.
+
+    Attributes
+    ----------
+    _entries
+        Mapping of season to a tuple of (cache key, processed results).
+
+    """
+
+    def __init__(self, max_seasons: int = MAX_CACHED_SEASONS) -> None:
+        """
+        Initialize an empty cache.
+
+        Parameters
+        ----------
+        max_seasons
+            Maximal number of seasons kept in the cache.
+
+        """
+        self._entries: OrderedDict[str, tuple[Any, SeasonResults]] = OrderedDict()
+        self._max_seasons = max_seasons
+        self._lock = threading.Lock()
+
+    def get(
+        self, season: str, events: dict[str, Event] | None, events_version: str
+    ) -> SeasonResults:
+        """
+        Get processed results of a season, loading them only if needed.
+
+        Parameters
+        ----------
+        season
+            Season identifier (e.g., '24-25').
+        events
+            All events of the season sorted by date (used for naming and
+            ordering races).
+        events_version
+            Version of the events (e.g. `EventManager.version`).
+
+        Returns
+        -------
+        Results table of every category (empty if the season has no results).
+
+        """
+        key = (results_signature(season), events_version)
+        with self._lock:
+            entry = self._entries.get(season)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(season)
+                return entry[1]
+
+        try:
+            with display_path(season).open(encoding="utf-8") as f:
+                season_results = build_results_tables(json.load(f), events)
+        except FileNotFoundError:
+            season_results = {}
+
+        with self._lock:
+            self._entries[season] = (key, season_results)
+            self._entries.move_to_end(season)
+            while len(self._entries) > self._max_seasons:
+                self._entries.popitem(last=False)
+        return season_results
+
+
+def results_signature(season: str) -> tuple[tuple[int, int] | None, ...]:
+    """
+    Get signature of results files of a season.
+
+    Parameters
+    ----------
+    season
+        Season identifier (e.g., '24-25').
+
+    Returns
+    -------
+    Modification time (ns) and size of every 'overall_<category>.csv' file
+    and of the display-ready results file (the last one), None for missing
+    files.
+
+    """
+    paths = [
+        Path(f"data/{season}/results/overall_{category}.csv")
+        for category in CATEGORIES
+    ]
+    signature: list[tuple[int, int] | None] = []
+    for path in [*paths, display_path(season)]:
+        try:
+            stat = path.stat()
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def display_path(season: str) -> Path:
+    """Get path to display-ready results of a season."""
+    return Path(f"data/{season}/results/{DISPLAY_RESULTS_FILE}")
+
+
+def results_modified_at(signature: tuple[tuple[int, int] | None, ...]) -> datetime:
+    """
+    Get time of the last modification of overall results files.
+
+    Parameters
+    ----------
+    signature
+        Signature of the results files (see `results_signature`).
+
+    Returns
+    -------
+    Modification time of the most recently modified file (epoch if there is none).
+
+    """
+    latest_mtime_ns = max((stat[0] for stat in signature if stat), default=0)
+    return datetime.fromtimestamp(latest_mtime_ns / 1e9, tz=UTC)
+
+
+def build_results_tables(
+    display: dict[str, Any], events: dict[str, Event] | None
+) -> SeasonResults:
+    """
+    Convert display-ready results of a season to immutable tables.
+
+    Cells come formatted from the results calculator, only the row class, the
+    medal emoji (in the first cell) and names and order of races are resolved
+    here, so rendering is a plain loop over tuples.
+
+    Parameters
+    ----------
+    display
+        Display-ready results exported by the results calculator (see
+        `results_calculator.display.build_display_results`).
+    events
+        All events of the season sorted by date.
+
+    Returns
+    -------
+    Results table of every category. Races are named after the events and
+    ordered by date, races without a known event go last (named by ORIS ID).
+
+    """
+    race_names = build_oris_name_mapping(events or {})
+    races = display["races"]
+    position = {oris_id: i for i, oris_id in enumerate(races)}
+    order = [position[oris_id] for oris_id in race_names if oris_id in position]
+    order += [i for oris_id, i in position.items() if oris_id not in race_names]
+    race_columns = tuple(race_names.get(races[i], str(races[i])) for i in order)
+    tables = {}
+    for category, results in display["categories"].items():
+        if category in MEDALS_BY_GENDER_CATEGORIES:
+            medal_classes = MEDAL_CLASSES
+        else:
+            medal_classes = PLACE_CLASSES
+        rows = []
+        search_texts = []
+        raw_rows = []
+        n_fixed = len(results["columns"])
+        for place, medal, *cells in results["rows"]:
+            cells = cells[:n_fixed] + [cells[n_fixed + i] for i in order]
+            css_class = medal_classes.get(medal, "")
+            emoji = MEDAL_EMOJIS.get(medal, "")
+            raw = (place, *cells)
+            formatted = tuple(cells)
+            if formatted:
+                formatted = (emoji + formatted[0], *formatted[1:])
+            rows.append(ResultsRow(css_class, place, formatted))
+            search_texts.append(_fold(" ".join(raw)))
+            raw_rows.append(raw)
+        columns = (*results["columns"], *race_columns)
+        sort_keys = tuple(
+            tuple(_sort_key(cell) for cell in column) for column in zip(*raw_rows)
+        ) or tuple(() for _ in range(len(columns) + 1))
+        tables[category] = ResultsTable(
+            columns, tuple(rows), tuple(search_texts), sort_keys
+        )
+    return tables
+
+
+def _fold(text: str) -> str:
+    """Fold text for case and diacritics insensitive comparison."""
+    return udc.unidecode(text).lower()
+
+
+def _sort_key(cell: str) -> tuple:
+    """Get sort key of a cell (numbers, e.g. points in '170 (5.)', go first)."""
+    number = re.match(r"\d+", cell)
+    if number is not None:
+        return (0, int(number.group()), "")
+    return (1, 0, _fold(cell))
+
+
+def query_results_table(
+    table: ResultsTable,
+    start: int = 0,
+    length: int = -1,
+    search: str = "",
+    order: list[tuple[int, bool]] | None = None,
+) -> tuple[int, list[ResultsRow]]:
+    """
+    Filter, sort and page rows of a results table.
+
+    Parameters
+    ----------
+    table
+        Results table of a category.
+    start
+        Index of the first returned row (of the filtered and sorted rows).
+    length
+        Maximal number of returned rows (all rows if negative).
+    search
+        Words which all must be in a row (case and diacritics insensitive).
+    order, optional
+        Column indices (0 = place) and descending flags to sort by, in order
+        of priority (rows are ordered by place if not given).
+
+    Returns
+    -------
+    Number of rows matching the search and the requested page of them.
+
+    """
+    indices: list[int] = list(range(len(table.rows)))
+    words = _fold(search).split()
+    if words:
+        indices = [i for i in indices if all(w in table.search_texts[i] for w in words)]
+    for column, descending in reversed(order or []):
+        if 0 <= column < len(table.sort_keys):
+            keys = table.sort_keys[column]
+            indices.sort(key=keys.__getitem__, reverse=descending)
+    stop = None if length < 0 else start + length
+    return len(indices), [table.rows[i] for i in indices[start:stop]]
+
+
+def build_datatables_page(table: ResultsTable, args: Mapping[str, str]) -> dict:
+    """
+    Build a page of a results table for DataTables' server-side processing.
+
+    Parameters
+    ----------
+    table
+        Results table of a category.
+    args
+        Request parameters sent by DataTables ('draw', 'start', 'length',
+        'search[value]', 'order[<i>][column]' and 'order[<i>][dir]').
+
+    Returns
+    -------
+    Draw counter, numbers of all and filtered rows and HTML of cells of the
+    requested rows (with the row class in 'DT_RowClass').
+
+    """
+    order: list[tuple[int, bool]] = []
+    while f"order[{len(order)}][column]" in args:
+        i = len(order)
+        order.append(
+            (
+                _int_arg(args, f"order[{i}][column]", 0),
+                args.get(f"order[{i}][dir]") == "desc",
+            )
+        )
+    filtered, rows = query_results_table(
+        table,
+        start=max(_int_arg(args, "start", 0), 0),
+        length=_int_arg(args, "length", -1),
+        search=args.get("search[value]", ""),
+        order=order,
+    )
+    return {
+        "draw": _int_arg(args, "draw", 0),
+        "recordsTotal": len(table.rows),
+        "recordsFiltered": filtered,
+        "data": [
+            {
+                "0": f"<strong>{escape(row.place)}</strong>",
+                **{str(i): str(escape(cell)) for i, cell in enumerate(row.cells, 1)},
+                "DT_RowClass": row.css_class,
+            }
+            for row in rows
+        ],
+    }
+
+
+def _int_arg(args: Mapping[str, str], name: str, default: int) -> int:
+    """Get an integer request parameter (default if missing or invalid)."""
+    try:
+        return int(args.get(name, default))
+    except ValueError:
+        return default
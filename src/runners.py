@@ -0,0 +1,276 @@
+"""Index of results of every runner across all seasons."""
+
+import bisect
+import heapq
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from results_calculator.race import normalize_name
+from results_calculator.runner_index import RUNNER_INDEX_FILE
+
+# Maximal number of runners returned by a search
+MAX_SEARCH_RESULTS = 50
+
+
+class RunnerIndex:
+    """
+    In-process copy of the runner index built by the results calculator.
+
+    The index file is loaded again only when its modification time (or size)
+    changes, lookups of runners are plain dictionary lookups.
+
+    Attributes
+    ----------
+    path
+        Path to the runner index file.
+    _runners
+        Runner id mapped to the runner's name, RegNo and records of results.
+    _search
+        Search index of runners' names and RegNos.
+    _signature
+        Modification time (ns) and size of the loaded index file.
+
+    """
+
+    def __init__(self, path: Path = RUNNER_INDEX_FILE) -> None:
+        """
+        Initialize an empty index (it's loaded on the first lookup).
+
+        Parameters
+        ----------
+        path
+            Path to the runner index file.
+
+        """
+        self.path = path
+        self._runners: dict[str, dict[str, Any]] = {}
+        self._search = RunnerSearch({})
+        self._signature: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def signature(self) -> tuple[int, int] | None:
+        """Modification time (ns) and size of the index file (None if missing)."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def modified_at(self) -> datetime:
+        """Time of the last modification of the index file."""
+        signature = self.signature
+        return datetime.fromtimestamp(signature[0] / 1e9 if signature else 0, tz=UTC)
+
+    def __contains__(self, runner_id: object) -> bool:
+        """Check whether a runner is in the index (without building its profile)."""
+        self._reload_if_changed()
+        return runner_id in self._runners
+
+    def get(self, runner_id: str) -> dict[str, Any] | None:
+        """
+        Get a runner from the index.
+
+        Parameters
+        ----------
+        runner_id
+            RegNo of the runner or slug of the name of an unregistered runner.
+
+        Returns
+        -------
+        Runner's id, name, RegNo and records of results (season, race,
+        category, place and points) or None if the runner isn't in the index.
+
+        """
+        self._reload_if_changed()
+        runner = self._runners.get(runner_id)
+        if runner is None:
+            return None
+        return {
+            "id": runner_id,
+            "name": runner["name"],
+            "reg_no": runner["reg_no"],
+            "records": [
+                dict(zip(["season", "race", "category", "place", "points"], record))
+                for record in runner["records"]
+            ],
+        }
+
+    def search(self, query: str, limit: int = MAX_SEARCH_RESULTS) -> list[dict]:
+        """
+        Find runners by (parts of) their name or RegNo.
+
+        Parameters
+        ----------
+        query
+            Searched text (case and diacritics insensitive).
+        limit
+            Maximal number of returned runners.
+
+        Returns
+        -------
+        Found runners (id, name, RegNo and seasons), best matches first.
+
+        """
+        self._reload_if_changed()
+        return self._search.search(query, limit)
+
+    def _reload_if_changed(self) -> None:
+        """Load the index file if it changed since it was loaded."""
+        signature = self.signature
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            try:
+                with self.path.open(encoding="utf-8") as f:
+                    runners = json.load(f).get("runners", {})
+            except FileNotFoundError:
+                runners = {}
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(
+                    "Runner index '%s' can't be loaded, ignoring it.\n%s", self.path, e
+                )
+                return
+            self._runners = runners
+            self._search = RunnerSearch(runners)
+            self._signature = signature
+
+
+class RunnerSearch:
+    """
+    Search index of runners' names and RegNos.
+
+    Names are folded (lowercase, without diacritics) and split to words.
+    Words are stored in a sorted list for prefix lookups and their trigrams
+    in an inverted index for lookups of substrings.
+
+    Attributes
+    ----------
+    _runners
+        Id, name, RegNo, seasons and folded text of every runner.
+    _words
+        Sorted (word, runner number) pairs.
+    _trigrams
+        Trigram mapped to numbers of runners with the trigram in their text.
+    _rank
+        Position of every runner in search results (more seasons first).
+
+    """
+
+    def __init__(self, runners: dict[str, dict[str, Any]]) -> None:
+        """
+        Build the search index.
+
+        Parameters
+        ----------
+        runners
+            Runner id mapped to the runner's name, RegNo and records of results.
+
+        """
+        self._runners: list[tuple[dict[str, Any], str]] = []
+        words: list[tuple[str, int]] = []
+        trigrams: defaultdict[str, set[int]] = defaultdict(set)
+        for runner_id, runner in runners.items():
+            text = normalize_name(f"{runner['name']} {runner['reg_no']}")
+            i = len(self._runners)
+            self._runners.append(
+                (
+                    {
+                        "id": runner_id,
+                        "name": runner["name"],
+                        "reg_no": runner["reg_no"],
+                        "seasons": sorted({record[0] for record in runner["records"]}),
+                    },
+                    text,
+                )
+            )
+            words.extend((word, i) for word in text.split())
+            for j in range(len(text) - 2):
+                trigrams[text[j : j + 3]].add(i)
+        words.sort()
+        self._words = words
+        self._trigrams = dict(trigrams)
+        # Runners with more seasons go first, then by name
+        order = sorted(
+            range(len(self._runners)),
+            key=lambda i: (-len(self._runners[i][0]["seasons"]), self._runners[i][1]),
+        )
+        self._rank = [0] * len(order)
+        for rank, i in enumerate(order):
+            self._rank[i] = rank
+
+    def search(self, query: str, limit: int = MAX_SEARCH_RESULTS) -> list[dict]:
+        """
+        Find runners whose name or RegNo contain all words of the query.
+
+        Runners with a word starting with every query word come first.
+
+        Parameters
+        ----------
+        query
+            Searched text (case and diacritics insensitive).
+        limit
+            Maximal number of returned runners.
+
+        Returns
+        -------
+        Found runners (id, name, RegNo and seasons).
+
+        """
+        query_words = normalize_name(query).split()
+        if not query_words:
+            return []
+
+        prefix_matches: set[int] | None = None
+        substring_matches: set[int] | None = None
+        for word in query_words:
+            prefixed = self._prefix_matches(word)
+            prefix_matches = (
+                prefixed if prefix_matches is None else prefix_matches & prefixed
+            )
+            if len(word) >= 3:
+                contained = self._substring_matches(word) | prefixed
+            else:
+                contained = prefixed
+            substring_matches = (
+                contained
+                if substring_matches is None
+                else substring_matches & contained
+            )
+
+        prefix_matches = prefix_matches or set()
+        found = heapq.nsmallest(limit, prefix_matches, key=self._rank.__getitem__)
+        found += heapq.nsmallest(
+            limit - len(found),
+            (substring_matches or set()) - prefix_matches,
+            key=self._rank.__getitem__,
+        )
+        return [self._runners[i][0] for i in found]
+
+    def _prefix_matches(self, prefix: str) -> set[int]:
+        """Get runners with a word starting with the prefix."""
+        matches = set()
+        start = bisect.bisect_left(self._words, (prefix, -1))
+        for word, i in self._words[start:]:
+            if not word.startswith(prefix):
+                break
+            matches.add(i)
+        return matches
+
+    def _substring_matches(self, substring: str) -> set[int]:
+        """Get runners whose text contains the substring (at least 3 chars)."""
+        candidates: set[int] | None = None
+        for j in range(len(substring) - 2):
+            runners = self._trigrams.get(substring[j : j + 3], set())
+            candidates = runners if candidates is None else candidates & runners
+            if not candidates:
+                return set()
+        return {i for i in candidates or () if substring in self._runners[i][1]}
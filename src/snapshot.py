@@ -0,0 +1,162 @@
+"""Sharing of loaded events between processes (e.g. gunicorn workers)."""
+
+import logging
+import os
+import pickle
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import IO
+
+if sys.platform != "win32":
+    import fcntl
+
+from src.event import Event
+from src.oris_cache import CACHE_DIR
+
+# Snapshot of events published by the refreshing process
+SNAPSHOT_PATH = CACHE_DIR / "events_snapshot.pkl"
+
+# Lock held by the process which refreshes the data
+LEADER_LOCK_PATH = CACHE_DIR / "refresher.lock"
+
+# Version of the snapshot format, bump it whenever EventSnapshot or Event
+# change (snapshots published by an older deploy are ignored)
+SNAPSHOT_SCHEMA = 1
+
+
+class EventSnapshot:
+    """
+    Immutable snapshot of all loaded events.
+
+    Attributes
+    ----------
+    events
+        Dictionary mapping season identifiers to their events.
+    version
+        Hash of the event data. It changes whenever the data change.
+    updated_at
+        Time (UTC) of the last change of the event data.
+    refreshed_at
+        Time (UTC) of the last refresh of data from ORIS (None if the events
+        were loaded only from configs and cached ORIS data).
+    oris_missing
+        Number of events without up-to-date ORIS data.
+    schema
+        Version of the snapshot format (see `SNAPSHOT_SCHEMA`).
+
+    """
+
+    def __init__(
+        self,
+        events: dict[str, dict[str, Event]],
+        version: str,
+        updated_at: datetime,
+        refreshed_at: datetime | None = None,
+        oris_missing: int = 0,
+    ) -> None:
+        self.events = events
+        self.version = version
+        self.updated_at = updated_at
+        self.refreshed_at = refreshed_at
+        self.oris_missing = oris_missing
+        self.schema = SNAPSHOT_SCHEMA
+
+
+class LeaderLock:
+    """
+    Exclusive lock electing a single process which refreshes the data.
+
+    The lock is held until the process exits, then another process can take
+    it over. Without `fcntl` (on Windows) every process is a leader.
+
+    Attributes
+    ----------
+    path
+        Path to the lock file.
+    _file
+        Open lock file (only in the leader process).
+
+    """
+
+    def __init__(self, path: Path = LEADER_LOCK_PATH) -> None:
+        self.path = path
+        self._file: IO | None = None
+
+    def acquire(self) -> bool:
+        """
+        Try to become the leader (without waiting).
+
+        Returns
+        -------
+        Whether this process is the leader.
+
+        """
+        if self._file is not None or sys.platform == "win32":
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = self.path.open("a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return False
+        self._file = f
+        logging.info("Process %d refreshes the shared data.", os.getpid())
+        return True
+
+
+def publish(snapshot: EventSnapshot, path: Path = SNAPSHOT_PATH) -> None:
+    """Store snapshot of events for other processes (atomically)."""
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("wb") as f:
+            pickle.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.error("Snapshot '%s' can't be published!\n%s", path, e)
+
+
+def load(
+    path: Path = SNAPSHOT_PATH, loaded_mtime: int | None = None
+) -> tuple[EventSnapshot, int] | None:
+    """
+    Load snapshot of events published by the leader.
+
+    Parameters
+    ----------
+    path
+        Path to the published snapshot.
+    loaded_mtime
+        Modification time (ns) of the snapshot loaded before.
+
+    Returns
+    -------
+    Snapshot and its modification time or None if there is no snapshot, it
+    didn't change since `loaded_mtime` or it has another format (see
+    `SNAPSHOT_SCHEMA`).
+
+    """
+    try:
+        mtime = path.stat().st_mtime_ns
+        if mtime == loaded_mtime:
+            return None
+        with path.open("rb") as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (
+        OSError,
+        pickle.UnpicklingError,
+        EOFError,
+        AttributeError,
+        ImportError,
+    ) as e:
+        logging.warning("Snapshot '%s' can't be loaded, ignoring it.\n%s", path, e)
+        return None
+    if getattr(snapshot, "schema", None) != SNAPSHOT_SCHEMA:
+        logging.warning("Snapshot '%s' has another format, ignoring it.", path)
+        return None
+    return snapshot, mtime
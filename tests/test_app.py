@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+# Importing the app mustn't start refreshing events from ORIS in the background
+with (
+    mock.patch("apscheduler.schedulers.background.BackgroundScheduler.start"),
+    mock.patch("atexit.register"),
+):
+    import app
+
+
+class NotFoundTest(unittest.TestCase):
+    """Responses of results and runner endpoints for unknown resources."""
+
+    def setUp(self) -> None:
+        self.client = app.app.test_client()
+
+    def test_results_api_of_unknown_season_or_category(self) -> None:
+        """Results API answers 404 for a season or a category without results."""
+        for url in [
+            "/api/00-01/results",
+            "/api/00-01/results/H",
+            "/api/24-25/results/X",
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_results_table_of_unknown_season_or_category(self) -> None:
+        """Results table of a category answers 404 if it has no results."""
+        for url in ["/00-01/results/H", "/24-25/results/X"]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_unknown_runner(self) -> None:
+        """Runner API answers 404, the runner page redirects home."""
+        self.assertEqual(self.client.get("/api/runner/nobody").status_code, 404)
+        response = self.client.get("/runner/nobody")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.location, "/home")
+
+
+if __name__ == "__main__":
+    unittest.main()
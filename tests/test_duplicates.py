@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+from results_calculator.duplicates import find_candidate_pairs
+
+
+class FindCandidatePairsTest(unittest.TestCase):
+    """Candidates of duplicate runners found by `find_candidate_pairs`."""
+
+    def _pairs(self, runners: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        df = pd.DataFrame(runners, columns=["Name", "RegNo"])
+        pairs = find_candidate_pairs(df)
+        return {
+            (df.loc[left, "Name"], df.loc[right, "Name"])
+            for left, right in pairs[["left", "right"]].itertuples(index=False)
+        }
+
+    def test_similar_surnames_are_not_candidates(self) -> None:
+        """Different surnames with the same first name don't match."""
+        pairs = self._pairs(
+            [
+                ("Bartová Petra", "nereg."),
+                ("Bauerová Petra", "nereg."),
+                ("Dvořák Petr", "nereg."),
+                ("Dvořáček Petr", "nereg."),
+                ("Kaděrová Jana", "nereg."),
+                ("Paděrová Jana", "nereg."),
+            ]
+        )
+        self.assertEqual(pairs, set())
+
+    def test_different_valid_reg_nos_are_not_candidates(self) -> None:
+        """Similar names with different valid RegNos don't match."""
+        pairs = self._pairs(
+            [("Nováková Jana", "ZBM1151"), ("Nováková Janna", "ZBM1152")]
+        )
+        self.assertEqual(pairs, set())
+
+    def test_typos_and_swapped_names_are_candidates(self) -> None:
+        """Typos in the first name and swapped names match."""
+        pairs = self._pairs(
+            [
+                ("Jégrová Eliška", "ZBM1153"),
+                ("Eliška Jégrová", "nereg."),
+                ("Novák Jan", "ZBM8001"),
+                ("Novák Jna", "nereg."),
+            ]
+        )
+        self.assertEqual(
+            pairs,
+            {("Jégrová Eliška", "Eliška Jégrová"), ("Novák Jan", "Novák Jna")},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from results_calculator.overall import (
+    _apply_similar_names_rules,
+    _group_fingerprint,
+    _manual_decision_rule,
+    _merge_runners,
+    _record_decision,
+)
+
+
+class SimilarNamesRulesTest(unittest.TestCase):
+    """Resolution of runners with similar names in `overall`."""
+
+    def test_merged_runner_in_similar_names_group(self) -> None:
+        """Merged runners keep missing results as NaN and can be resolved again."""
+        group = pd.DataFrame(
+            {
+                "Name": ["Novák Jan", "Novák Jan", "Nowák Jan"],
+                "RegNo": ["ZBM8001", "nereg.", "ZBM8001"],
+                "100-Points": [180.0, np.nan, np.nan],
+                "101-Points": [np.nan, 170.0, 160.0],
+                "102-Points": [np.nan, np.nan, 150.0],
+                "name_unified": ["novak jan", "novak jan", "nowak jan"],
+            },
+            index=[1, 2, 3],
+        )
+
+        merged = _merge_runners(group.loc[[1, 2]], pd.Index([1, 2]), 1)
+        similar = pd.concat([merged.assign(name_unified="novak jan"), group.loc[[3]]])
+        undecided: list[pd.DataFrame] = []
+        result = _apply_similar_names_rules(similar, {}, undecided)
+
+        self.assertTrue(np.isnan(merged.loc[1, "102-Points"]))
+        # Both ran race 101 with a different result - kept separated
+        self.assertEqual(len(result), 1)
+        self.assertEqual(list(result[0].index), [1, 3])
+        self.assertEqual(undecided, [])
+
+
+class DecisionsJournalTest(unittest.TestCase):
+    """Recording and replaying manual decisions about duplicate runners."""
+
+    def setUp(self) -> None:
+        self.group = pd.DataFrame(
+            {
+                "Name": ["Novák Jan", "Novák Jan", "Nowák Jan"],
+                "RegNo": ["ZBM8001", "nereg.", "nereg."],
+                "100-Points": [180.0, np.nan, np.nan],
+                "101-Points": [np.nan, 170.0, 160.0],
+                "name_unified": ["novak jan", "novak jan", "nowak jan"],
+            },
+            index=[1, 2, 3],
+        )
+
+    def _journal(self, decision: str) -> dict:
+        """Record a decision and store it in the journal format (JSON)."""
+        decisions = {
+            _group_fingerprint(self.group): _record_decision(self.group, decision)
+        }
+        return json.loads(json.dumps(decisions))
+
+    def test_decision_replayed_with_other_row_ids(self) -> None:
+        """A recorded merge is applied to the same runners with other row ids."""
+        journal = self._journal("1,2")
+        # Next run - the same runners in another order with other row ids
+        rerun = self.group.iloc[[2, 0, 1]].set_axis([7, 5, 6])
+        self.assertEqual(list(journal), [_group_fingerprint(rerun)])
+
+        undecided: list[pd.DataFrame] = []
+        result = _manual_decision_rule(rerun, journal, undecided)
+
+        self.assertEqual(undecided, [])
+        self.assertEqual(len(result), 2)
+        self.assertEqual(list(result[0].index), [7])
+        merged = result[1]
+        self.assertEqual(list(merged.index), [5])
+        self.assertEqual(merged.loc[5, "RegNo"], "ZBM8001")
+        self.assertEqual(merged.loc[5, "100-Points"], 180.0)
+        self.assertEqual(merged.loc[5, "101-Points"], 170.0)
+
+    def test_decision_not_replayed_for_other_group(self) -> None:
+        """A group with another runner needs a new decision."""
+        journal = self._journal("1,2")
+        other = self.group.copy()
+        other.loc[3, "Name"] = "Nowak Jan"
+
+        undecided: list[pd.DataFrame] = []
+        result = _manual_decision_rule(other, journal, undecided)
+
+        self.assertEqual(len(undecided), 1)
+        self.assertEqual([list(df.index) for df in result], [[1, 2, 3]])
+
+
+if __name__ == "__main__":
+    unittest.main()
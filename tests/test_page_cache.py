@@ -0,0 +1,58 @@
+import unittest
+from datetime import UTC, datetime
+
+from flask import Flask
+
+from src.page_cache import PageCache
+
+LAST_MODIFIED = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class PageCacheTest(unittest.TestCase):
+    """Conditional requests and invalidation of pages in `PageCache`."""
+
+    def setUp(self) -> None:
+        self.app = Flask(__name__)
+        self.cache = PageCache()
+        self.renders = 0
+
+    def _render(self) -> str:
+        self.renders += 1
+        return f"<p>render {self.renders}</p>"
+
+    def _respond(
+        self, version: str, etag: str | None = None
+    ) -> tuple[int, str | None, bytes]:
+        """Request the page (conditionally if an ETag is given)."""
+        headers = {"If-None-Match": f'"{etag}"'} if etag else {}
+        with self.app.test_request_context(headers=headers):
+            response = self.cache.respond(
+                ("page",), version, LAST_MODIFIED, self._render
+            )
+            return response.status_code, response.get_etag()[0], response.get_data()
+
+    def test_not_modified_without_rendering(self) -> None:
+        """A request with the current ETag gets 304 and the page isn't rendered."""
+        status, etag, page = self._respond("v1")
+        self.assertEqual((status, page), (200, b"<p>render 1</p>"))
+
+        status, same_etag, page = self._respond("v1", etag)
+        self.assertEqual((status, same_etag, page), (304, etag, b""))
+
+        status, _, page = self._respond("v1")
+        self.assertEqual((status, page), (200, b"<p>render 1</p>"))
+        self.assertEqual(self.renders, 1)
+
+    def test_version_bump_invalidates_etag(self) -> None:
+        """A new version of the data changes the ETag and renders the page again."""
+        _, old_etag, _ = self._respond("v1")
+
+        status, etag, page = self._respond("v2", old_etag)
+
+        self.assertEqual(status, 200)
+        self.assertNotEqual(etag, old_etag)
+        self.assertEqual(page, b"<p>render 2</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from results_calculator.race import ZV_KID_YEAR, index_known_unregs, score_race
+
+
+class SplitZvClassTest(unittest.TestCase):
+    """Splitting of the ZV class in `score_race`."""
+
+    def test_known_unreg_keeps_finishing_order(self) -> None:
+        """Places in Z follow the finishing order, not the order of result IDs."""
+        reg_no = f"ZBM{ZV_KID_YEAR % 100:02d}01"
+        results_data = {
+            "Result_1": {
+                "ID": "30",
+                "ClassDesc": "ZV",
+                "Place": "1.",
+                "Name": "Novák Jan",
+                "RegNo": reg_no,
+                "UserID": "1",
+                "Time": "20:00",
+            },
+            "Result_2": {
+                "ID": "10",
+                "ClassDesc": "ZV",
+                "Place": "2.",
+                "Name": "Known Kid",
+                "RegNo": "",
+                "UserID": "",
+                "Time": "21:00",
+            },
+            "Result_3": {
+                "ID": "20",
+                "ClassDesc": "ZV",
+                "Place": "3.",
+                "Name": "Kid Two",
+                "RegNo": reg_no[:-1] + "2",
+                "UserID": "2",
+                "Time": "22:00",
+            },
+        }
+        known_unregs = index_known_unregs(
+            [{"Name": "Known Kid", "yob": ZV_KID_YEAR, "RegNo": "nereg."}]
+        )
+
+        df = score_race(results_data, known_unregs)
+
+        df_z = df[df["ClassDesc"] == "Z"]
+        self.assertEqual(
+            list(zip(df_z["Name"], df_z["Place"])),
+            [("Novák Jan", "1."), ("Known Kid", "2."), ("Kid Two", "3.")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
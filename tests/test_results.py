@@ -0,0 +1,65 @@
+import unittest
+
+from src.results import build_results_tables, query_results_table
+
+DISPLAY = {
+    "season": "24-25",
+    "races": [101, 102],
+    "categories": {
+        "H": {
+            "columns": ["Jméno", "RegNo", "Součet (2 z 2)"],
+            "rows": [
+                ["1", "gold", "Novák Jan", "ZBM8001", "390", "200 (1.)", "190 (2.)"],
+                ["2", "silver", "Dvořák Petr", "ZBM8002", "372", "190 (2.)", "---"],
+                ["3", "bronze", "Šťastný Jan", "ZBM8003", "282", "---", "200 (1.)"],
+                ["4", "", "Novotný Karel", "nereg.", "182", "182 (3.)", "---"],
+            ],
+        }
+    },
+}
+
+
+class QueryResultsTableTest(unittest.TestCase):
+    """Filtering, sorting and paging rows in `query_results_table`."""
+
+    def setUp(self) -> None:
+        self.table = build_results_tables(DISPLAY, None)["H"]
+
+    def _places(self, **kwargs) -> tuple[int, list[str]]:
+        filtered, rows = query_results_table(self.table, **kwargs)
+        return filtered, [row.place for row in rows]
+
+    def test_search_ignores_case_and_diacritics(self) -> None:
+        """All searched words must be in a row, case and diacritics don't matter."""
+        self.assertEqual(self._places(search="JAN"), (2, ["1", "3"]))
+        self.assertEqual(self._places(search="stastny jan"), (1, ["3"]))
+        self.assertEqual(self._places(search="nereg. karel"), (1, ["4"]))
+        self.assertEqual(self._places(search="nobody"), (0, []))
+
+    def test_order_by_points_and_text(self) -> None:
+        """Race cells are sorted by points, missing results after numbers."""
+        # Column 4 = the first race (0 = place)
+        self.assertEqual(self._places(order=[(4, False)])[1], ["4", "2", "1", "3"])
+        self.assertEqual(self._places(order=[(4, True)])[1], ["3", "1", "2", "4"])
+        # Ties are broken by the following columns
+        self.assertEqual(
+            self._places(order=[(5, True), (1, False)])[1], ["2", "4", "3", "1"]
+        )
+        # Column 1 = name
+        self.assertEqual(self._places(order=[(1, False)])[1], ["2", "1", "4", "3"])
+        # Unknown column is ignored
+        self.assertEqual(self._places(order=[(99, True)])[1], ["1", "2", "3", "4"])
+
+    def test_paging(self) -> None:
+        """Pages are taken from filtered and sorted rows."""
+        self.assertEqual(self._places(start=1, length=2), (4, ["2", "3"]))
+        self.assertEqual(self._places(start=3), (4, ["4"]))
+        self.assertEqual(self._places(start=10, length=5), (4, []))
+        self.assertEqual(
+            self._places(start=1, length=1, search="jan", order=[(0, True)]),
+            (2, ["1"]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
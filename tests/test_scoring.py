@@ -0,0 +1,25 @@
+import unittest
+
+import pandas as pd
+
+from results_calculator.scoring import SCORING_SCHEMES, get_points, load_points_table
+
+
+class ScoringSchemesTest(unittest.TestCase):
+    """Points tables of scoring schemes."""
+
+    def test_bzl_scheme_equals_previous_points_rule(self) -> None:
+        """The 'bzl' scheme gives the same points as the former hard-coded rule."""
+        expected = [200, 190, 182, 176, 172] + [176 - p for p in range(6, 176)]
+        self.assertEqual(SCORING_SCHEMES["bzl"], expected)
+        self.assertEqual(len(SCORING_SCHEMES["bzl"]), 175)
+
+    def test_places_without_points(self) -> None:
+        """DISK, MS and places beyond the table get no points."""
+        places = pd.Series(["1.", "6.", "175.", "176.", "DISK", "MS"])
+        points = get_points(places, load_points_table(None, "bzl"))
+        self.assertEqual(points.tolist(), [200, 170, 1, 0, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()